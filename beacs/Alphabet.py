@@ -0,0 +1,144 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+from typing import Any, Iterable, List
+
+
+class Alphabet:
+    """
+    Interns the symbols of the perceptions to small integers.
+
+    Perceptions, conditions and effects coded with an alphabet are stored as
+    `bytes`, so that every comparison done by the agent is an integer one.
+    The code 0 is reserved for the wildcard. The symbols are only rebuilt to
+    print the classifiers.
+    """
+
+    WILDCARD = 0
+    MAX_SYMBOLS = 256
+
+    def __init__(
+            self,
+            symbols: Iterable = (),
+            wildcard='#'
+        ) -> None:
+        """
+        Parameters
+        ----------
+        symbols: Iterable
+            Symbols known beforehand, the other ones are interned when first seen
+        wildcard
+            Symbol printed for the wildcard
+        """
+        self.wildcard = wildcard
+        self._symbols = [wildcard]
+        self._codes = {wildcard: self.WILDCARD}
+        for symbol in symbols:
+            self.code(symbol)
+
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._codes
+
+
+    def __repr__(self):
+        return "Alphabet({})".format(self._symbols[1:])
+
+
+    def code(
+            self,
+            symbol
+        ) -> int:
+        """
+        Gives the code of a symbol, interning it if needed.
+
+        Parameters
+        ----------
+        symbol
+            Hashable attribute of a perception
+
+        Returns
+        -------
+        int
+            Code of the symbol
+        """
+        code = self._codes.get(symbol)
+        if code is None:
+            code = len(self._symbols)
+            if code >= self.MAX_SYMBOLS:
+                raise ValueError("An alphabet cannot hold more than {} symbols".format(self.MAX_SYMBOLS))
+            self._symbols.append(symbol)
+            self._codes[symbol] = code
+        return code
+
+
+    def symbol(
+            self,
+            code: int
+        ) -> Any:
+        """
+        Gives the symbol related to a code.
+
+        Parameters
+        ----------
+        code: int
+            Code of the symbol
+
+        Returns
+        -------
+        Any
+            The symbol
+        """
+        return self._symbols[code]
+
+
+    def encode(
+            self,
+            observation: Iterable
+        ) -> bytes:
+        """
+        Codes an observation. Observations already coded are returned as is.
+
+        Parameters
+        ----------
+        observation: Iterable
+            Symbols of the observation
+
+        Returns
+        -------
+        bytes
+            Codes of the symbols
+        """
+        if isinstance(observation, (bytes, bytearray)):
+            return bytes(observation)
+        try:
+            return bytes(map(self._codes.__getitem__, observation))
+        except KeyError:
+            return bytes(self.code(symbol) for symbol in observation)
+
+
+    def decode(
+            self,
+            codes: Iterable[int]
+        ) -> List:
+        """
+        Rebuilds the symbols of a coded observation.
+
+        Parameters
+        ----------
+        codes: Iterable[int]
+            Coded observation
+
+        Returns
+        -------
+        List
+            Symbols of the observation
+        """
+        return [self._symbols[code] for code in codes]
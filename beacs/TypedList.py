@@ -42,6 +42,9 @@ class TypedList(collections.abc.MutableSequence):
     def __getitem__(self, i):
         return self._items[i]
 
+    def __iter__(self):
+        return iter(self._items)
+
     def __len__(self) -> int:
         return len(self._items)
 
@@ -1,3 +1,4 @@
 from .utils import check_types
 from .Perception import Perception
+from .Alphabet import Alphabet
 from .TypedList import TypedList
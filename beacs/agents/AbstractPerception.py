@@ -1,14 +1,27 @@
 from copy import copy
 
 class AbstractPerception:
+    """
+    Attributes are kept in a mutable buffer (a list, or a bytearray when they
+    are coded by an alphabet) so that setting one of them does not copy the
+    others. Use `freeze` to get an immutable snapshot.
+    """
 
-    def __init__(self, observation, wildcard='#', oktypes=(str)):
-        self._items = tuple(observation)
+    __slots__ = ['_items', 'wildcard', 'alphabet']
+
+    def __init__(self, observation, wildcard='#', oktypes=(str), alphabet=None):
+        if alphabet is None:
+            self._items = list(observation)
+        elif isinstance(observation, AbstractPerception):
+            self._items = bytearray(observation._items)
+        else:
+            self._items = bytearray(alphabet.encode(observation))
         self.wildcard = wildcard
+        self.alphabet = alphabet
 
 
     @classmethod
-    def empty(cls, length: int, wildcard='#', oktypes=(str)):
+    def empty(cls, length: int, wildcard='#', oktypes=(str), alphabet=None):
         """
         Creates an AbstractPerception composed from wildcard symbols.
         Note that in case that wildcard is an object is get's copied
@@ -22,14 +35,18 @@ class AbstractPerception:
             wildcard symbol
         oktypes: (str)
             tuple of allowed classes to represent perception string
+        alphabet: Alphabet
+            alphabet coding the symbols, if any
 
         Returns
         -------
         AbstractPerception
             generic AbstractPerception
         """
+        if alphabet is not None:
+            return cls(bytes([wildcard]) * length, wildcard=wildcard, alphabet=alphabet)
         ps_str = [copy(wildcard) for _ in range(length)]
-        return cls(ps_str)
+        return cls(ps_str, wildcard=wildcard)
 
     def __iter__(self):
         return iter(self._items)
@@ -41,15 +58,29 @@ class AbstractPerception:
         return self._items[index]
 
     def __setitem__(self, index, value):
-        lst = list(self._items)
-        lst[index] = value
-        self._items = tuple(lst)
+        self._items[index] = value
 
     def __eq__(self, other):
         return self._items == other._items
 
     def __hash__(self):
-        return hash(self._items)
+        return hash(self.freeze())
+
+    def freeze(self):
+        """
+        Returns an immutable copy of the attributes, that can be used as a
+        dict or set key.
+
+        Returns
+        -------
+        tuple or bytes
+            Attributes of the perception
+        """
+        if self.alphabet is not None:
+            return bytes(self._items)
+        return tuple(self._items)
 
     def __repr__(self):
-        return ''.join(map(str, self._items))
\ No newline at end of file
+        if self.alphabet is not None:
+            return ''.join(map(str, self.alphabet.decode(self._items)))
+        return ''.join(map(str, self._items))
@@ -1,6 +1,8 @@
 from collections import namedtuple
 from typing import Callable, List, Tuple
 
+from beacs.agents.MetricsSink import MetricsSink
+
 TrialMetrics = namedtuple('TrialMetrics', ['steps', 'reward'])
 
 
@@ -18,7 +20,21 @@ class Agent:
     def get_cfg(self):
         raise NotImplementedError()
 
-    def explore(self, env, trials) -> Tuple:
+    def get_profiler(self):
+        """
+        Gives the profiler timing the phases of the trials, None if the
+        phases are not profiled.
+        """
+        return None
+
+    def _window_metrics(self) -> dict:
+        """
+        Gives the metrics of the agent itself gathered since the last
+        metrics trial.
+        """
+        return {}
+
+    def explore(self, env, trials, metrics_sink: MetricsSink = None) -> Tuple:
         """
         Explores the environment in given set of trials.
 
@@ -28,15 +44,18 @@ class Agent:
             environment
         trials
             number of trials
+        metrics_sink: MetricsSink
+            sink the metrics are written to as they are collected, instead
+            of being returned
 
         Returns
         -------
         Tuple
             population of classifiers and metrics
         """
-        return self._evaluate(env, trials, self._run_trial_explore)
+        return self._evaluate(env, trials, self._run_trial_explore, metrics_sink)
 
-    def exploit(self, env, trials) -> Tuple:
+    def exploit(self, env, trials, metrics_sink: MetricsSink = None) -> Tuple:
         """
         Exploits the environments in given set of trials (always executing
         best possible action - no exploration).
@@ -47,15 +66,18 @@ class Agent:
             environment
         trials
             number of trials
+        metrics_sink: MetricsSink
+            sink the metrics are written to as they are collected, instead
+            of being returned
 
         Returns
         -------
         Tuple
             population of classifiers and metrics
         """
-        return self._evaluate(env, trials, self._run_trial_exploit)
+        return self._evaluate(env, trials, self._run_trial_exploit, metrics_sink)
 
-    def explore_exploit(self, env, trials) -> Tuple:
+    def explore_exploit(self, env, trials, metrics_sink: MetricsSink = None) -> Tuple:
         """
         Alternates between exploration and exploitation phases.
 
@@ -65,6 +87,9 @@ class Agent:
             environment
         trials
             number of trials
+        metrics_sink: MetricsSink
+            sink the metrics are written to as they are collected, instead
+            of being returned
 
         Returns
         -------
@@ -77,9 +102,9 @@ class Agent:
             else:
                 return self._run_trial_exploit(env, None, current_trial)
 
-        return self._evaluate(env, trials, switch_phases)
+        return self._evaluate(env, trials, switch_phases, metrics_sink)
 
-    def _evaluate(self, env, max_trials: int, func: Callable) -> Tuple:
+    def _evaluate(self, env, max_trials: int, func: Callable, metrics_sink: MetricsSink = None) -> Tuple:
         """
         Runs the classifier in desired strategy (see `func`) and collects
         metrics.
@@ -93,6 +118,10 @@ class Agent:
         func: Callable
             Function accepting three parameters: env, steps already made,
              current trial
+        metrics_sink: MetricsSink
+            sink the metrics are written to as they are collected, the
+            metrics returned being empty, all of them being written when
+            returning
 
         Returns
         -------
@@ -114,9 +143,15 @@ class Agent:
         current_trial = 1
         steps = 0
 
+        profiler = self.get_profiler()
+
         metrics: List = []
         while current_trial <= max_trials:
-            steps_in_trial, reward = func(env, steps, current_trial)
+            if profiler is None:
+                steps_in_trial, reward = func(env, steps, current_trial)
+            else:
+                with profiler.trial(current_trial):
+                    steps_in_trial, reward = func(env, steps, current_trial)
             steps += steps_in_trial
 
             if current_trial % self.get_cfg().metrics_trial_frequency == 0:
@@ -124,8 +159,16 @@ class Agent:
                 user_metrics = self.get_cfg().user_metrics_collector_fcn
                 if user_metrics is not None:
                     m.update(user_metrics(self.get_population(), env))
-                metrics.append(m)
+                m.update(self._window_metrics())
+                if profiler is not None:
+                    m.update(profiler.collect())
+                if metrics_sink is None:
+                    metrics.append(m)
+                else:
+                    metrics_sink.write(m)
 
             current_trial += 1
 
+        if metrics_sink is not None:
+            metrics_sink.flush()
         return self.get_population(), metrics
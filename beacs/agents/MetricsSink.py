@@ -0,0 +1,263 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+import csv
+import io
+import json
+import struct
+import time
+from typing import Dict, List
+
+import numpy as np
+
+
+def _json_default(value):
+    # NumPy scalars given by some metrics collectors
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError("{} is not JSON serializable".format(type(value).__name__))
+
+
+class MetricsSink:
+    """
+    Writes the metrics of the trials of an agent as they are collected,
+    instead of keeping them in memory until the last trial.
+
+    The metrics are buffered and written by batches, every `buffer_size`
+    windows or every `flush_interval` seconds, so that another process can
+    read the batches already written while the agent is still running.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            buffer_size: int = 100,
+            flush_interval: float = 5.
+        ) -> None:
+        """
+        Parameters
+        ----------
+        path: str
+            File the metrics are written in, replaced if it exists
+        buffer_size: int
+            Maximal number of windows kept before being written
+        flush_interval: float
+            Maximal number of seconds a window is kept before being written
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._file = self._open(path)
+
+
+    def _open(self, path: str):
+        raise NotImplementedError()
+
+
+    def _write_batch(self, batch: List[dict]) -> None:
+        raise NotImplementedError()
+
+
+    def write(self, metrics: dict) -> None:
+        """
+        Adds the metrics of a window.
+
+        Parameters
+        ----------
+        metrics: dict
+            Metrics of the window
+        """
+        self._buffer.append(metrics)
+        if len(self._buffer) >= self.buffer_size or \
+                time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+
+    def flush(self) -> None:
+        """
+        Writes the buffered windows.
+        """
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            self._write_batch(batch)
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+
+    def close(self) -> None:
+        """
+        Writes the buffered windows and closes the file.
+        """
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JSONLinesSink(MetricsSink):
+    """
+    Writes the metrics of every window as a JSON line.
+    """
+
+    def _open(self, path: str):
+        return open(path, 'w')
+
+
+    def _write_batch(self, batch: List[dict]) -> None:
+        self._file.write(''.join(json.dumps(metrics, default=_json_default) + '\n' for metrics in batch))
+
+
+class CSVSink(MetricsSink):
+    """
+    Writes the metrics of every window as a CSV row.
+
+    The columns are the metrics of the first batch written, the missing ones
+    being left empty. A metric appearing later only raises a ValueError
+    instead of being lost: the metrics of an agent are the same at every
+    window.
+    """
+
+    def _open(self, path: str):
+        self._writer = None
+        return open(path, 'w', newline='')
+
+
+    def _write_batch(self, batch: List[dict]) -> None:
+        if self._writer is None:
+            fieldnames = list(dict.fromkeys(name for metrics in batch for name in metrics))
+            self._writer = csv.DictWriter(self._file, fieldnames, restval='')
+            self._writer.writeheader()
+        columns = set(self._writer.fieldnames)
+        unknown = list(dict.fromkeys(name for metrics in batch for name in metrics if name not in columns))
+        if unknown:
+            raise ValueError("Metrics {} are not columns of {}".format(unknown, self.path))
+        self._writer.writerows(batch)
+
+
+class ColumnarSink(MetricsSink):
+    """
+    Writes the metrics in a binary file of column batches.
+
+    The file starts with MAGIC, then every batch is its length as a little
+    endian unsigned integer, the JSON list of its columns and one array per
+    column in the NumPy .npy format. Missing numerical values are NaN,
+    missing other values empty strings. Use read_columns to read it.
+    """
+
+    MAGIC = b'BEACSMET'
+    _LENGTH = struct.Struct('<Q')
+
+    def _open(self, path: str):
+        metrics_file = open(path, 'wb')
+        metrics_file.write(self.MAGIC)
+        return metrics_file
+
+
+    @staticmethod
+    def _column(values: List) -> np.ndarray:
+        if None not in values:
+            column = np.asarray(values)
+            if column.dtype != object:
+                return column
+        try:
+            return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        except (TypeError, ValueError):
+            return np.array(['' if value is None else str(value) for value in values])
+
+
+    def _write_batch(self, batch: List[dict]) -> None:
+        names = list(dict.fromkeys(name for metrics in batch for name in metrics))
+        content = io.BytesIO()
+        header = json.dumps(names).encode()
+        content.write(self._LENGTH.pack(len(header)))
+        content.write(header)
+        for name in names:
+            np.lib.format.write_array(content, self._column([metrics.get(name) for metrics in batch]),
+                allow_pickle=False)
+        # A batch is written at once, its length first, so that a reader
+        # never takes a batch being written for a complete one
+        self._file.write(self._LENGTH.pack(content.tell()) + content.getvalue())
+
+
+def read_json_lines(path: str) -> List[dict]:
+    """
+    Reads the metrics written by a JSONLinesSink, possibly still running.
+
+    Parameters
+    ----------
+    path: str
+        File of the metrics
+
+    Returns
+    -------
+    List[dict]
+        Metrics of the windows written so far
+    """
+    metrics = []
+    with open(path) as metrics_file:
+        for line in metrics_file:
+            # The last line may be being written
+            if not line.endswith('\n'):
+                break
+            metrics.append(json.loads(line))
+    return metrics
+
+
+def read_columns(path: str) -> Dict[str, np.ndarray]:
+    """
+    Reads the metrics written by a ColumnarSink, possibly still running.
+
+    Parameters
+    ----------
+    path: str
+        File of the metrics
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Column of every metric over the windows written so far, NaN where a
+        numerical metric is missing
+    """
+    batches = []
+    length = ColumnarSink._LENGTH
+    with open(path, 'rb') as metrics_file:
+        if metrics_file.read(len(ColumnarSink.MAGIC)) != ColumnarSink.MAGIC:
+            raise ValueError("Not a file of metrics columns")
+        while True:
+            size = metrics_file.read(length.size)
+            if len(size) < length.size:
+                break
+            size, = length.unpack(size)
+            content = metrics_file.read(size)
+            # The last batch may be being written
+            if len(content) < size:
+                break
+            batch = io.BytesIO(content)
+            header_size, = length.unpack(batch.read(length.size))
+            names = json.loads(batch.read(header_size).decode())
+            batches.append({name: np.lib.format.read_array(batch, allow_pickle=False) for name in names})
+
+    names = list(dict.fromkeys(name for batch in batches for name in batch))
+    columns = {}
+    for name in names:
+        numerical = next(batch[name] for batch in batches if name in batch).dtype.kind in 'biuf'
+        parts = []
+        for batch in batches:
+            if name in batch:
+                parts.append(batch[name])
+            else:
+                parts.append(np.full(len(next(iter(batch.values()))), np.nan if numerical else ''))
+        columns[name] = np.concatenate(parts)
+    return columns
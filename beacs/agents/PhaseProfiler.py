@@ -0,0 +1,193 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterable
+
+
+class _Phase:
+    """
+    Times a call of a phase, as a context manager. The size of the set
+    handled can be given once known, through `size`.
+    """
+
+    __slots__ = ['_record', '_name', '_start', 'size']
+
+    def __init__(self, record, name: str) -> None:
+        self._record = record
+        self._name = name
+        self.size = 0
+
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self._record(self._name, time.perf_counter() - self._start, self.size)
+
+
+class _NoPhase:
+    """
+    Stands for a phase that is not timed.
+    """
+
+    __slots__ = ['size']
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NO_PHASE = _NoPhase()
+
+
+def phase(profiler, name: str):
+    """
+    Gives the context timing a call of a phase by a profiler, a context
+    doing nothing if there is no profiler.
+
+    Parameters
+    ----------
+    profiler: Optional[PhaseProfiler]
+        Profiler, None if the phases are not profiled
+    name: str
+        Name of the phase
+
+    Returns
+    -------
+    Context manager whose `size` attribute takes the size of the set handled
+    """
+    if profiler is None:
+        return NO_PHASE
+    return _Phase(profiler._record, name)
+
+
+class PhaseProfiler:
+    """
+    Records the cumulative wall time, the number of calls and the sizes of
+    the sets handled by the phases of the trials of an agent.
+
+    The agent times its phases itself, through `phase`. A phase called
+    inside another one is counted in both. A profiler only times the agent
+    owning it, so that agents of the same process are profiled on their own.
+    """
+
+    def __init__(
+            self,
+            phases: Iterable[str] = (),
+            unsized: Iterable[str] = (),
+            history: int = 0
+        ) -> None:
+        """
+        Parameters
+        ----------
+        phases: Iterable[str]
+            Phases of the agent, collected whether they were called or not
+        unsized: Iterable[str]
+            Phases without set size, whose mean size is not collected
+        history: int
+            Number of the last trials whose statistics are kept in `trials`,
+            none by default
+        """
+        self.phases = list(phases)
+        self.unsized = set(unsized)
+        # Statistics by phase: [time, calls, sum of the sizes]
+        self.totals = {}
+        # Statistics of the last trials, as (trial, statistics by phase)
+        self.trials = deque(maxlen=history)
+        self._current = {}
+        self._window = {}
+
+
+    def _record(
+            self,
+            phase: str,
+            elapsed: float,
+            size: int
+        ) -> None:
+        for statistics in (self.totals, self._current, self._window):
+            record = statistics.get(phase)
+            if record is None:
+                statistics[phase] = [elapsed, 1, size]
+            else:
+                record[0] += elapsed
+                record[1] += 1
+                record[2] += size
+
+
+    def phase(
+            self,
+            name: str
+        ) -> _Phase:
+        """
+        Gives the context timing a call of a phase.
+
+        Parameters
+        ----------
+        name: str
+            Name of the phase
+
+        Returns
+        -------
+        _Phase
+            Context manager whose `size` attribute takes the size of the set
+            handled
+        """
+        return _Phase(self._record, name)
+
+
+    @contextmanager
+    def trial(
+            self,
+            trial: int
+        ):
+        """
+        Gathers the statistics of the phases called during a trial.
+
+        Parameters
+        ----------
+        trial: int
+            Number of the trial
+        """
+        self._current = {}
+        try:
+            yield
+        finally:
+            if self.trials.maxlen:
+                self.trials.append((trial, self._current))
+
+
+    def collect(self) -> dict:
+        """
+        Gives the statistics of the phases since the last collection, to be
+        merged into the metrics of a trial.
+
+        Returns
+        -------
+        dict
+            Wall time, number of calls and mean size of the sets handled by
+            each phase, under the keys '<phase>_time', '<phase>_calls' and
+            '<phase>_size', the last one for the phases with a size only.
+            The phases of the agent are all given, with zeros if they were
+            not called, so that the keys are the same at every collection
+        """
+        metrics = {}
+        called = [phase for phase in self._window if phase not in self.phases]
+        for phase in self.phases + called:
+            elapsed, calls, size = self._window.get(phase, (0., 0, 0))
+            metrics[phase + '_time'] = elapsed
+            metrics[phase + '_calls'] = calls
+            if phase not in self.unsized:
+                metrics[phase + '_size'] = size / calls if calls else 0.
+        self._window = {}
+        return metrics
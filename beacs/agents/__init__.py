@@ -1,3 +1,5 @@
 from .Agent import Agent
+from .PhaseProfiler import PhaseProfiler
+from .MetricsSink import MetricsSink, JSONLinesSink, CSVSink, ColumnarSink
 from .EnvironmentAdapter import EnvironmentAdapter
 from .AbstractPerception import AbstractPerception
@@ -0,0 +1,83 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+
+from beacs.agents.beacs import Classifier, IndexedClassifiersList
+from beacs.agents.beacs.ClassifierColumns import ClassifierColumns, slots_of
+
+
+class ArrayClassifiersList(IndexedClassifiersList):
+    """
+    Population of classifiers keeping their numerical parameters (q, ra, rb,
+    ir, num, exp, talp, tga, tbseq, tav, err) in NumPy columns.
+
+    The row of a classifier is its slot in the condition index. While it
+    belongs to the population, a classifier is a ClassifierView reading and
+    writing its row, so that aggregates over match sets and action sets are
+    computed on arrays. A classifier removed from the population gets its
+    parameters back.
+    """
+
+    def __init__(self, *args) -> None:
+        self._store = ClassifierColumns()
+        super().__init__(*args)
+
+
+    def __reduce__(self):
+        return self.__class__, tuple(self)
+
+
+    def _rebuild(self) -> None:
+        # Rows are renumbered as the slots are: give the parameters back first
+        for slot, cl in getattr(self, '_members', {}).items():
+            if self._store.owns(cl, slot):
+                self._store.detach(cl)
+        super()._rebuild()
+
+
+    def _register(
+            self,
+            cl: Classifier
+        ) -> int:
+        slot = super()._register(cl)
+        self._store.attach(cl, slot)
+        return slot
+
+
+    def _unregister(
+            self,
+            slot: int
+        ) -> None:
+        cl = self._members[slot]
+        if self._store.owns(cl, slot):
+            self._store.detach(cl)
+        super()._unregister(slot)
+
+
+    def _fitness_aggregates(
+            self,
+            matching: List[Classifier]
+        ) -> tuple:
+        anticipating = [cl for cl in matching if cl.does_anticipate_change()]
+        located = slots_of(anticipating)
+        if located is None:
+            return super()._fitness_aggregates(anticipating)
+        store, slots = located
+        q = store.q[slots]
+        behavioral_sequence_lengths = np.array(
+            [len(cl.behavioral_sequence) if cl.behavioral_sequence else 0 for cl in anticipating],
+            dtype=np.int64
+        )
+        fitness = store.fitness(slots, behavioral_sequence_lengths, anticipating[0].cfg.bs_max)
+        best_classifier = anticipating[int(np.argmax(fitness))]
+        max_fitness_ra = (q * store.ra[slots]).max().item()
+        max_fitness_rb = (q * store.rb[slots]).max().item()
+        return best_classifier, max_fitness_ra, max_fitness_rb
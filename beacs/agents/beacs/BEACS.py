@@ -4,14 +4,23 @@
     file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
-from typing import List, Tuple
+from collections import Counter
+from typing import Tuple
 
 from beacs import Perception
 from beacs.agents.Agent import Agent, TrialMetrics
+from beacs.agents.PhaseProfiler import PhaseProfiler, phase
 from beacs.agents.beacs import Classifier, ClassifiersList, Configuration
 from beacs.agents.beacs.Condition import Condition
 from beacs.agents.beacs.Effect import Effect
 from beacs.agents.beacs.components.action_selection import choose_classifier
+from beacs.agents.beacs.components.checkpoint import read_checkpoint, write_checkpoint
+from beacs.agents.beacs.components.lifecycle import window
+from beacs.agents.beacs.components.subsumption import find_subsumed
+
+# Phases of the trials timed when profiling, with the ones handling no set
+PHASES = ('match_set', 'alp', 'pep', 'pai', 'rl', 'ga', 'choose_classifier', 'env_step', 'to_genotype')
+UNSIZED_PHASES = ('env_step', 'to_genotype')
 
 class BEACS(Agent):
 
@@ -20,12 +29,27 @@ class BEACS(Agent):
             population: ClassifiersList=None
             ) -> None:
         self.cfg = cfg
-        self.population = population or ClassifiersList()
+        population_class = cfg.population_class or ClassifiersList
+        if population is None:
+            population = population_class()
+        elif not isinstance(population, population_class):
+            population = population_class(*population)
+        self.population = population
         self.pai_states_memory = []
+        self.profiler = PhaseProfiler(PHASES, UNSIZED_PHASES, cfg.phase_profiling_history) if cfg.do_phase_profiling else None
+        # Counts of the creations and removals of classifiers by origin
+        self.lifecycle = Counter()
+        self._lifecycle_window_start = Counter()
 
     def get_population(self)-> ClassifiersList:
         return self.population
 
+    def _new_population(self, classifiers)-> ClassifiersList:
+        """
+        Builds a population of the same kind as the current one.
+        """
+        return self.population.__class__(*classifiers)
+
     def duplicate_population(self)-> ClassifiersList:
         duplicate_population = []
         for cl in self.population:
@@ -36,37 +60,98 @@ class BEACS(Agent):
             cl_copy.tbseq = cl.tbseq
             cl_copy.talp = cl.talp
             duplicate_population.append(cl_copy)
-        return ClassifiersList(*duplicate_population)
+        return self._new_population(duplicate_population)
 
     def get_cfg(self)-> Configuration:
         return self.cfg
 
+    def get_profiler(self)-> PhaseProfiler:
+        return self.profiler
+
+    def get_lifecycle(self)-> Counter:
+        return self.lifecycle
+
+    def _window_metrics(self)-> dict:
+        metrics = window(self.lifecycle, self._lifecycle_window_start)
+        self._lifecycle_window_start = self.lifecycle.copy()
+        return metrics
+
+    def _phase(self, name: str):
+        """
+        Gives the context timing a call of a phase of the trials, doing
+        nothing if the phases are not profiled.
+        """
+        return phase(self.profiler, name)
+
+    def _perceive(self, env, raw_state)-> Perception:
+        """
+        Gives the perception of a state of the environment.
+        """
+        with self._phase('to_genotype'):
+            state = self.cfg.environment_adapter.to_genotype(env, raw_state)
+        return self.cfg.encode(state)
+
+    def _step(self, env, action: int)-> Tuple:
+        """
+        Executes an action in the environment, giving the perception of the
+        new state, the reward and whether the trial is over.
+        """
+        iaction = self.cfg.environment_adapter.to_lcs_action(env, action)
+        with self._phase('env_step'):
+            raw_state, reward, done, _ = env.step(iaction)
+        return self._perceive(env, raw_state), reward, done
+
     def get_pai_states_memory(self):
         return self.pai_states_memory
 
+    def save_checkpoint(self, file)-> None:
+        """
+        Saves the population, the aliased states, the counts of the life of
+        the classifiers and the states of the random generators in a binary
+        checkpoint, a path or a binary file.
+        """
+        write_checkpoint(file, self.cfg, self.population, self.pai_states_memory, self.lifecycle)
+
+    @classmethod
+    def from_checkpoint(
+            cls,
+            file,
+            cfg: Configuration=None,
+            restore_random_state: bool=True
+        ):
+        """
+        Creates an agent from a checkpoint saved by save_checkpoint, with its
+        configuration or with `cfg`, restoring the states of the random
+        generators unless told otherwise.
+        """
+        checkpoint = read_checkpoint(file, cfg, restore_random_state)
+        agent = cls(checkpoint.cfg, checkpoint.classifiers)
+        agent.pai_states_memory = checkpoint.pai_states_memory
+        agent.lifecycle.update(checkpoint.lifecycle)
+        agent._lifecycle_window_start = agent.lifecycle.copy()
+        return agent
+
     def zip_population(
             self,
             does_anticipate_change:bool=False,
-            is_reliable:bool=False
+            is_reliable:bool=False,
+            processes:int=None
         ):
         # Remove multiple occurence of same classifiers
-        self.population = ClassifiersList(*list(dict.fromkeys(self.population)))
+        self.population = self._new_population(dict.fromkeys(self.population))
         # Keep or not classifiers that anticipate changes
         if does_anticipate_change:
             pop = [cl for cl in self.population if cl.does_anticipate_change()]
-            self.population = ClassifiersList(*pop)
+            self.population = self._new_population(pop)
         # Keep all classifiers or only reliable classifiers
         if is_reliable:
             pop = [cl for cl in self.population if cl.is_reliable()]
-            self.population = ClassifiersList(*pop)
+            self.population = self._new_population(pop)
         # Removing subsumed classifiers and unwanted behavioral classifiers
+        subsumed = find_subsumed(self.population, processes)
         classifiers_to_keep = []
-        for cl in self.population:
-            to_keep = True
-            for other in self.population:
-                if cl != other and other.subsumes(cl):
-                    to_keep = False
-                    break
+        for idx, cl in enumerate(self.population):
+            to_keep = idx not in subsumed
             if to_keep and cl.behavioral_sequence is not None and \
                 not cl.is_experienced():
                 to_keep = False
@@ -75,7 +160,7 @@ class BEACS(Agent):
                 to_keep = False
             if to_keep:
                 classifiers_to_keep.append(cl)
-        self.population = ClassifiersList(*classifiers_to_keep)
+        self.population = self._new_population(classifiers_to_keep)
 
 
     def _run_trial_explore(
@@ -88,7 +173,7 @@ class BEACS(Agent):
         # Initial conditions
         steps = 0
         raw_state = env.reset()
-        state = self.cfg.environment_adapter.to_genotype(env, raw_state)
+        state = self._perceive(env, raw_state)
         last_reward = 0
         total_reward = 0
         prev_state = Perception.empty()
@@ -105,58 +190,68 @@ class BEACS(Agent):
         while not done:
             
             # Creation of the matching set
-            match_set, _, max_fitness_ra, max_fitness_rb = self.population.form_match_set(state)
+            with self._phase('match_set') as timed:
+                match_set, _, max_fitness_ra, max_fitness_rb = self.population.form_match_set(state)
+                timed.size = len(match_set)
 
             # Apply learning in the last action set
             if steps > 0:
-                ClassifiersList.apply_alp(
-                    self.population,
-                    t_2_match_set,
-                    t_1_match_set,
-                    match_set,
-                    action_set,
-                    t_2_activated_classifier,
-                    prev_state,
-                    t_1_activated_classifier.action,
-                    state,
-                    time + steps,
-                    self.pai_states_memory,
-                    self.cfg
-                )
-                ClassifiersList.apply_reinforcement_learning(
-                    action_set, last_reward, max_fitness_ra, max_fitness_rb, self.cfg.beta_rl, self.cfg.gamma
-                )
-                ClassifiersList.apply_ga(
-                    time + steps,
-                    self.population,
-                    match_set,
-                    action_set,
-                    prev_state,
-                    state,
-                    self.cfg.theta_ga,
-                    self.cfg.mu,
-                    self.cfg.chi,
-                    self.cfg.theta_as
-                )
+                with self._phase('alp') as timed:
+                    timed.size = len(action_set)
+                    ClassifiersList.apply_alp(
+                        self.population,
+                        t_2_match_set,
+                        t_1_match_set,
+                        match_set,
+                        action_set,
+                        t_2_activated_classifier,
+                        prev_state,
+                        t_1_activated_classifier.action,
+                        state,
+                        time + steps,
+                        self.pai_states_memory,
+                        self.cfg,
+                        lifecycle=self.lifecycle,
+                        profiler=self.profiler
+                    )
+                with self._phase('rl') as timed:
+                    timed.size = len(action_set)
+                    ClassifiersList.apply_reinforcement_learning(
+                        action_set, last_reward, max_fitness_ra, max_fitness_rb, self.cfg.beta_rl, self.cfg.gamma
+                    )
+                with self._phase('ga') as timed:
+                    timed.size = len(action_set)
+                    ClassifiersList.apply_ga(
+                        time + steps,
+                        self.population,
+                        match_set,
+                        action_set,
+                        prev_state,
+                        state,
+                        self.cfg.theta_ga,
+                        self.cfg.mu,
+                        self.cfg.chi,
+                        self.cfg.theta_as,
+                        lifecycle=self.lifecycle
+                    )
 
             # Record the previous match set
             t_2_match_set = t_1_match_set
             t_1_match_set = match_set
             # Choose classifier
-            action_classifier = choose_classifier(match_set, self.cfg, self.cfg.epsilon)
+            with self._phase('choose_classifier') as timed:
+                timed.size = len(match_set)
+                action_classifier = choose_classifier(match_set, self.cfg, self.cfg.epsilon)
             # Tmp : Mountaincar -> epsilon degréssif : max(0.01, self.cfg.epsilon-current_trial/10000)
             # Record last activated classifier
             t_2_activated_classifier = t_1_activated_classifier
             t_1_activated_classifier = action_classifier
             # Create action set
             action_set = match_set.form_action_set(action_classifier)
-            # Use environment adapter
-            iaction = self.cfg.environment_adapter.to_lcs_action(env, action_classifier.action)
             # Do the action
             prev_state = state
-            raw_state, last_reward, done, _ = env.step(iaction)
+            state, last_reward, done = self._step(env, action_classifier.action)
             total_reward += last_reward
-            state = self.cfg.environment_adapter.to_genotype(env, raw_state)
             
             if done and action_classifier.behavioral_sequence:
                 action_set = match_set.form_action_set(Classifier(action=action_classifier.action, cfg=self.cfg))
@@ -166,12 +261,10 @@ class BEACS(Agent):
                 bseq_rescue = []
                 # Initialize the message list usefull to decrease quality of classifiers containing looping sequences
                 for act in action_classifier.behavioral_sequence:
-                    # Use environment adapter to execute the action act and perceive its results
-                    iaction = self.cfg.environment_adapter.to_lcs_action(env, act)
-                    raw_state, last_reward, done, _ = env.step(iaction)
+                    # Execute the action act and perceive its results
+                    state, last_reward, done = self._step(env, act)
                     bseq_rescue.append(act)
                     total_reward += last_reward
-                    state = self.cfg.environment_adapter.to_genotype(env, raw_state)
                     if done:
                         action_set = match_set.form_action_set(Classifier(action=action_classifier.action, behavioral_sequence=bseq_rescue, cfg=self.cfg))
                         break
@@ -179,35 +272,44 @@ class BEACS(Agent):
 
 
             if done:
-                ClassifiersList.apply_alp(
-                    self.population,
-                    t_2_match_set,
-                    t_1_match_set,
-                    ClassifiersList(),
-                    action_set,
-                    t_2_activated_classifier,
-                    prev_state,
-                    t_1_activated_classifier.action,
-                    state,
-                    time + steps,
-                    self.pai_states_memory,
-                    self.cfg
-                )
-                ClassifiersList.apply_reinforcement_learning(
-                    action_set, last_reward, 0., 0., self.cfg.beta_rl, self.cfg.gamma
-                )
-                ClassifiersList.apply_ga(
-                    time + steps,
-                    self.population,
-                    ClassifiersList(),
-                    action_set,
-                    prev_state,
-                    state,
-                    self.cfg.theta_ga,
-                    self.cfg.mu,
-                    self.cfg.chi,
-                    self.cfg.theta_as
-                )
+                with self._phase('alp') as timed:
+                    timed.size = len(action_set)
+                    ClassifiersList.apply_alp(
+                        self.population,
+                        t_2_match_set,
+                        t_1_match_set,
+                        ClassifiersList(),
+                        action_set,
+                        t_2_activated_classifier,
+                        prev_state,
+                        t_1_activated_classifier.action,
+                        state,
+                        time + steps,
+                        self.pai_states_memory,
+                        self.cfg,
+                        lifecycle=self.lifecycle,
+                        profiler=self.profiler
+                    )
+                with self._phase('rl') as timed:
+                    timed.size = len(action_set)
+                    ClassifiersList.apply_reinforcement_learning(
+                        action_set, last_reward, 0., 0., self.cfg.beta_rl, self.cfg.gamma
+                    )
+                with self._phase('ga') as timed:
+                    timed.size = len(action_set)
+                    ClassifiersList.apply_ga(
+                        time + steps,
+                        self.population,
+                        ClassifiersList(),
+                        action_set,
+                        prev_state,
+                        state,
+                        self.cfg.theta_ga,
+                        self.cfg.mu,
+                        self.cfg.chi,
+                        self.cfg.theta_as,
+                        lifecycle=self.lifecycle
+                    )
 
             steps += 1
         return TrialMetrics(steps, total_reward)
@@ -222,7 +324,7 @@ class BEACS(Agent):
         # Initial conditions
         steps = 0
         raw_state = env.reset()
-        state = self.cfg.environment_adapter.to_genotype(env, raw_state)
+        state = self._perceive(env, raw_state)
         last_reward = 0
         total_reward = 0
         action_set = ClassifiersList()
@@ -231,42 +333,45 @@ class BEACS(Agent):
         while not done:
 
             # Compute in one run the matching set, the best matching classifier and the best matching fitness associated to the previous classifier
-            match_set, _, max_fitness_ra, max_fitness_rb = self.population.form_match_set(state)
+            with self._phase('match_set') as timed:
+                match_set, _, max_fitness_ra, max_fitness_rb = self.population.form_match_set(state)
+                timed.size = len(match_set)
 
             if steps > 0:
                 # Apply algorithms
-                ClassifiersList.apply_reinforcement_learning(
-                    action_set, last_reward, max_fitness_ra, max_fitness_rb, self.cfg.beta_rl, self.cfg.gamma
-                )
+                with self._phase('rl') as timed:
+                    timed.size = len(action_set)
+                    ClassifiersList.apply_reinforcement_learning(
+                        action_set, last_reward, max_fitness_ra, max_fitness_rb, self.cfg.beta_rl, self.cfg.gamma
+                    )
 
             # Choose classifier
-            best_classifier = choose_classifier(match_set, self.cfg, self.cfg.epsilon)
+            with self._phase('choose_classifier') as timed:
+                timed.size = len(match_set)
+                best_classifier = choose_classifier(match_set, self.cfg, self.cfg.epsilon)
             # Create action set
             action_set = match_set.form_action_set(best_classifier)
-            # Use environment adapter
-            iaction = self.cfg.environment_adapter.to_lcs_action(env, best_classifier.action)
             # Do the action
-            raw_state, last_reward, done, _ = env.step(iaction)
+            state, last_reward, done = self._step(env, best_classifier.action)
             total_reward += last_reward
-            state = self.cfg.environment_adapter.to_genotype(env, raw_state)
 
             # Enter the if condition only if we have chosen a behavioral classifier
             if not done and best_classifier.behavioral_sequence :
                 for act in best_classifier.behavioral_sequence:
-                    # Use environment adapter to execute the action act and perceive its results
-                    iaction = self.cfg.environment_adapter.to_lcs_action(env, act)
-                    raw_state, last_reward, done, _ = env.step(iaction)
+                    # Execute the action act and perceive its results
+                    state, last_reward, done = self._step(env, act)
                     total_reward += last_reward
-                    state = self.cfg.environment_adapter.to_genotype(env, raw_state)
                     if done:
                         break
                     steps += 1
 
             if done:
                 # Apply algorithms
-                ClassifiersList.apply_reinforcement_learning(
-                    action_set, last_reward, 0., 0., self.cfg.beta_rl, self.cfg.gamma
-                )
+                with self._phase('rl') as timed:
+                    timed.size = len(action_set)
+                    ClassifiersList.apply_reinforcement_learning(
+                        action_set, last_reward, 0., 0., self.cfg.beta_rl, self.cfg.gamma
+                    )
 
             steps += 1
 
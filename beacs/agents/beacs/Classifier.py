@@ -6,7 +6,7 @@
 
 from __future__ import annotations
 
-from typing import Optional, Union, List
+from typing import Optional, Union, Sequence
 
 from beacs import Perception
 from beacs.agents.beacs import Configuration, Condition, EffectList, Effect, PMark
@@ -15,13 +15,14 @@ from beacs.agents.beacs import Configuration, Condition, EffectList, Effect, PMa
 class Classifier:
 
     __slots__ = ['condition', 'action', 'behavioral_sequence', 'effect', 'mark', 'q', 'ra', 'rb',
-        'ir', 'num', 'exp', 'talp', 'tga', 'tbseq', 'tav', 'cfg', 'ee', 'aliased_state', 'pai_state', 'err']
+        'ir', 'num', 'exp', 'talp', 'tga', 'tbseq', 'tav', 'cfg', 'ee', 'aliased_state', 'pai_state', 'err',
+        '_store', '_slot']
 
     def __init__(
             self,
             condition: Union[Condition, str, None] = None,
             action: Optional[int] = None,
-            behavioral_sequence: Optional[List[int]] = None,
+            behavioral_sequence: Optional[Sequence[int]] = None,
             effect: Optional[Effect] = None,
             quality: float=0.5,
             rewarda: float=0.,
@@ -45,15 +46,17 @@ class Classifier:
                 cls,
                 initial,
                 length=self.cfg.classifier_length,
-                wildcard=self.cfg.classifier_wildcard
+                wildcard=self.cfg.classifier_wildcard,
+                alphabet=self.cfg.alphabet
             ):
             if initial:
-                return cls(initial, wildcard=wildcard)
-            return cls.empty(wildcard=wildcard, length=length)
+                return cls(initial, wildcard=wildcard, alphabet=alphabet)
+            return cls.empty(wildcard=wildcard, length=length, alphabet=alphabet)
 
         self.condition = _build_perception_string(Condition, condition)
         self.action = action
-        self.behavioral_sequence = behavioral_sequence
+        # Kept as a tuple so that it can key the buckets of the match sets
+        self.behavioral_sequence = tuple(behavioral_sequence) if behavioral_sequence is not None else None
         self.effect = EffectList(_build_perception_string(Effect, effect), self.cfg.classifier_length, self.cfg.classifier_wildcard)
         self.mark = PMark(cfg=self.cfg)
         self.q = quality
@@ -79,9 +82,9 @@ class Classifier:
 
 
     def __eq__(self, other):
-        if self.condition == other.condition and \
-                self.action == other.action and \
+        if self.action == other.action and \
                 self.behavioral_sequence == other.behavioral_sequence and \
+                self.condition == other.condition and \
                 self.effect == other.effect:
             return True
         return False
@@ -96,10 +99,10 @@ class Classifier:
 
 
     def __repr__(self):
-        return f"C:{self.condition} A:{self.action} {str(self.behavioral_sequence)} E:{str(self.effect)}\n" \
+        return f"C:{self.condition} A:{self.action} {str(list(self.behavioral_sequence) if self.behavioral_sequence is not None else None)} E:{str(self.effect)}\n" \
             f"q: {self.q:<6.4} ra: {self.ra:<6.4} rb: {self.rb:<6.4} ir: {self.ir:<6.4} f: {self.fitness:<6.4} err: {self.err:<6.4}\n" \
             f"exp: {self.exp:<5} num: {self.num} ee: {self.ee}\n" \
-            f"Mark: {str(self.mark)} Can_be_generalized: {str(self.effect.enhanced_trace_ga)} Aliased_state: {''.join(str(attr) for attr in self.aliased_state)} PAI_state: {''.join(str(attr) for attr in self.pai_state)}\n" \
+            f"Mark: {str(self.mark)} Can_be_generalized: {str(self.effect.enhanced_trace_ga)} Aliased_state: {self.cfg.decode(self.aliased_state)} PAI_state: {self.cfg.decode(self.pai_state)}\n" \
             f"tga: {self.tga:<5} tbseq: {self.tbseq:<5} talp: {self.talp:<5} tav: {self.tav:<6.4} \n" \
 
 
@@ -127,7 +130,7 @@ class Classifier:
             New copied classifier - Hard copy
         """
         new_cls = cls(
-            condition=Condition(old_cls.condition, old_cls.cfg.classifier_wildcard),
+            condition=Condition(old_cls.condition, old_cls.cfg.classifier_wildcard, alphabet=old_cls.cfg.alphabet),
             action=old_cls.action,
             behavioral_sequence=old_cls.behavioral_sequence,
             quality=old_cls.q,
@@ -142,12 +145,10 @@ class Classifier:
             aliased_state=old_cls.aliased_state,
             pai_state=old_cls.pai_state
         )
-        new_cls.effect.effect_list = []
-        for oeffect in old_cls.effect:
-            effect_to_append = Effect.empty(new_cls.cfg.classifier_length)
-            for i in range(new_cls.cfg.classifier_length):
-                effect_to_append[i] = oeffect[i]
-            new_cls.effect.effect_list.append(effect_to_append)
+        new_cls.effect.effect_list = [
+            Effect(oeffect, new_cls.cfg.classifier_wildcard, alphabet=new_cls.cfg.alphabet)
+            for oeffect in old_cls.effect
+        ]
         new_cls.effect.effect_detailled_counter = old_cls.effect.effect_detailled_counter[:]
         new_cls.effect.enhanced_trace_ga = old_cls.effect.enhanced_trace_ga[:]
         new_cls.effect.update_enhanced_trace_ga(new_cls.cfg.classifier_length)
@@ -515,7 +516,7 @@ class Classifier:
                         self.effect.enhanced_trace_ga[idx] = False
             else:
                 new_effect_index = len(self.effect)
-                self.effect.effect_list.append(Effect.empty(length, wildcard))
+                self.effect.effect_list.append(Effect.empty(length, wildcard, alphabet=self.cfg.alphabet))
                 self.effect.effect_detailled_counter.append(1)
                 for idx in range(length):
                     if previous_situation[idx] != situation[idx]:
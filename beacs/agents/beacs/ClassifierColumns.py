@@ -0,0 +1,310 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+from __future__ import annotations
+
+from operator import attrgetter
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from beacs.agents.beacs import Classifier
+
+
+# Numerical parameters of the classifiers stored in columns
+NUMERICAL_PARAMETERS = {
+    'q': np.float64,
+    'ra': np.float64,
+    'rb': np.float64,
+    'ir': np.float64,
+    'num': np.int64,
+    'exp': np.int64,
+    'talp': np.int64,
+    'tga': np.int64,
+    'tbseq': np.int64,
+    'tav': np.float64,
+    'err': np.float64
+}
+
+
+class ClassifierColumns:
+    """
+    Stores the numerical parameters of classifiers in contiguous NumPy
+    columns, a classifier being a row given by its slot.
+    """
+
+    def __init__(
+            self,
+            capacity: int = 64
+        ) -> None:
+        self.capacity = capacity
+        for name, dtype in NUMERICAL_PARAMETERS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+
+    @classmethod
+    def from_arrays(
+            cls,
+            arrays: dict
+        ) -> ClassifierColumns:
+        """
+        Wraps existing columns, such as read-only memory maps, without
+        copying them.
+
+        Parameters
+        ----------
+        arrays: dict
+            One array per numerical parameter, by name
+
+        Returns
+        -------
+        ClassifierColumns
+            Columns
+        """
+        columns = cls.__new__(cls)
+        columns.capacity = len(arrays['q'])
+        for name in NUMERICAL_PARAMETERS:
+            setattr(columns, name, arrays[name])
+        return columns
+
+
+    def _reserve(
+            self,
+            slot: int
+        ) -> None:
+        if slot < self.capacity:
+            return
+        capacity = self.capacity
+        while capacity <= slot:
+            capacity *= 2
+        for name in NUMERICAL_PARAMETERS:
+            column = getattr(self, name)
+            new_column = np.zeros(capacity, dtype=column.dtype)
+            new_column[:self.capacity] = column
+            setattr(self, name, new_column)
+        self.capacity = capacity
+
+
+    def attach(
+            self,
+            cl: Classifier,
+            slot: int
+        ) -> None:
+        """
+        Moves the numerical parameters of a classifier in a row of the columns
+        and turns the classifier into a view on this row.
+
+        Parameters
+        ----------
+        cl: Classifier
+            Classifier, possibly a view on other columns
+        slot: int
+            Row given to the classifier
+        """
+        values = [getattr(cl, name) for name in NUMERICAL_PARAMETERS]
+        self._reserve(slot)
+        for name, value in zip(NUMERICAL_PARAMETERS, values):
+            getattr(self, name)[slot] = value
+        cl._store = self
+        cl._slot = slot
+        cl.__class__ = ClassifierView
+
+
+    def detach(
+            self,
+            cl: Classifier
+        ) -> None:
+        """
+        Turns back a view on these columns into a plain classifier holding
+        its own numerical parameters.
+
+        Parameters
+        ----------
+        cl: Classifier
+            View on these columns
+        """
+        values = [getattr(cl, name) for name in NUMERICAL_PARAMETERS]
+        cl.__class__ = Classifier
+        for name, value in zip(NUMERICAL_PARAMETERS, values):
+            setattr(cl, name, value)
+        cl._store = None
+
+
+    def owns(
+            self,
+            cl: Classifier,
+            slot: int
+        ) -> bool:
+        """
+        Checks whether the classifier is the view on the row `slot`.
+        """
+        return type(cl) is ClassifierView and cl._store is self and cl._slot == slot
+
+
+    def fitness(
+            self,
+            slots: np.ndarray,
+            behavioral_sequence_lengths: np.ndarray,
+            bs_max: int
+        ) -> np.ndarray:
+        """
+        Computes the fitness of several classifiers, as Classifier.fitness does.
+
+        Parameters
+        ----------
+        slots: np.ndarray
+            Rows of the classifiers
+        behavioral_sequence_lengths: np.ndarray
+            Lengths of the behavioral sequences, 0 if there is none
+        bs_max: int
+            Maximal length of behavioral sequence
+
+        Returns
+        -------
+        np.ndarray
+            Fitness values
+        """
+        epsilon = 1e-6
+        q, ra, rb = self.q[slots], self.ra[slots], self.rb[slots]
+        max_r = np.where(rb > ra, rb, ra)
+        fitness = q * max_r
+        behavioral = behavioral_sequence_lengths > 0
+        if behavioral.any():
+            min_r = np.where(rb < ra, rb, ra)
+            diff = max_r[behavioral] - min_r[behavioral] + epsilon
+            fitness[behavioral] = q[behavioral] * (max_r[behavioral] - diff * behavioral_sequence_lengths[behavioral] / bs_max)
+        return fitness
+
+
+def _plain_classifier(state: dict) -> Classifier:
+    cl = Classifier.__new__(Classifier)
+    for name, value in state.items():
+        setattr(cl, name, value)
+    return cl
+
+
+def _column_property(name: str) -> property:
+    def fget(self):
+        return getattr(self._store, name).item(self._slot)
+    def fset(self, value):
+        getattr(self._store, name)[self._slot] = value
+    return property(fget, fset)
+
+
+class ClassifierView(Classifier):
+    """
+    Classifier whose numerical parameters live in ClassifierColumns.
+    A copy or a pickle of a view is a plain classifier.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def copy_from(
+            cls,
+            old_cls: Classifier,
+            time: int
+        ) -> Classifier:
+        return Classifier.copy_from(old_cls, time)
+
+
+    def __reduce_ex__(self, protocol):
+        state = {}
+        for name in Classifier.__slots__:
+            if name not in ('_store', '_slot') and hasattr(self, name):
+                state[name] = getattr(self, name)
+        return _plain_classifier, (state,)
+
+
+for _name in NUMERICAL_PARAMETERS:
+    setattr(ClassifierView, _name, _column_property(_name))
+
+
+_get_store = attrgetter('_store')
+_get_slot = attrgetter('_slot')
+
+
+def slots_of(
+        classifiers: Sequence[Classifier]
+    ) -> Optional[tuple]:
+    """
+    Gives the columns and the rows of classifiers, if all of them are views
+    on the same columns.
+
+    Parameters
+    ----------
+    classifiers: Sequence[Classifier]
+        Classifiers
+
+    Returns
+    -------
+    Optional[tuple]
+        The ClassifierColumns and the array of the rows, None otherwise
+    """
+    if not classifiers or set(map(type, classifiers)) != {ClassifierView}:
+        return None
+    stores = set(map(_get_store, classifiers))
+    if len(stores) != 1:
+        return None
+    slots = np.fromiter(map(_get_slot, classifiers), dtype=np.intp, count=len(classifiers))
+    return stores.pop(), slots
+
+
+def gather(
+        classifiers: Sequence[Classifier],
+        *names: str
+    ) -> Optional[List[np.ndarray]]:
+    """
+    Gathers numerical parameters of classifiers viewing the same columns.
+
+    Parameters
+    ----------
+    classifiers: Sequence[Classifier]
+        Classifiers
+    names: str
+        Names of the parameters
+
+    Returns
+    -------
+    Optional[List[np.ndarray]]
+        One array per parameter, in the order of the classifiers,
+        None if the classifiers do not view the same columns
+    """
+    located = slots_of(classifiers)
+    if located is None:
+        return None
+    store, slots = located
+    return [getattr(store, name)[slots] for name in names]
+
+
+def assign(
+        classifiers: Sequence[Classifier],
+        name: str,
+        value
+    ) -> bool:
+    """
+    Sets a numerical parameter of classifiers viewing the same columns.
+
+    Parameters
+    ----------
+    classifiers: Sequence[Classifier]
+        Classifiers
+    name: str
+        Name of the parameter
+    value
+        New value
+
+    Returns
+    -------
+    bool
+        False if the classifiers do not view the same columns, nothing being set
+    """
+    located = slots_of(classifiers)
+    if located is None:
+        return False
+    store, slots = located
+    getattr(store, name)[slots] = value
+    return True
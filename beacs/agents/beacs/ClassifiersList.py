@@ -7,8 +7,8 @@
 from __future__ import annotations
 
 import random
+from collections import Counter
 from itertools import chain
-from operator import attrgetter
 from typing import Optional, List
 
 import beacs.agents.beacs.components.alp as alp
@@ -16,9 +16,11 @@ import beacs.agents.beacs.components.genetic_algorithms as ga
 import beacs.agents.beacs.components.reinforcement_learning as rl
 import beacs.agents.beacs.components.aliasing_detection as pai
 from beacs import Perception, TypedList
+from beacs.agents.PhaseProfiler import PhaseProfiler, phase
 from beacs.agents.beacs import Classifier, Configuration
 from beacs.agents.beacs.components.add_classifier import add_classifier
 from beacs.agents.beacs.components.build_behavioral_sequences import create_behavioral_classifier
+from beacs.agents.beacs.components.lifecycle import count_creation, count_event
 
 class ClassifiersList(TypedList):
     """
@@ -29,6 +31,27 @@ class ClassifiersList(TypedList):
         super().__init__((Classifier, ), *args)
 
 
+    def matching(
+            self,
+            situation: Perception
+        ) -> List[Classifier]:
+        """
+        Returns the classifiers of the list whose condition matches
+        the situation, in the order of the list.
+
+        Parameters
+        ----------
+        situation: Perception
+            Current perception
+
+        Returns
+        ----------
+        List[Classifier]
+            The matching classifiers
+        """
+        return [cl for cl in self if cl.does_match(situation)]
+
+
     def form_match_set(
             self,
             situation: Perception
@@ -44,16 +67,51 @@ class ClassifiersList(TypedList):
 
         Returns
         ----------
-        ClassifiersList
+        MatchSet
             The whole set of matching classifiers
         """
-        matching = [cl for cl in self if cl.does_match(situation)]
-        matching_with_change_anticipated = [cl for cl in matching if cl.does_anticipate_change()]
-        best_classifier = max(matching_with_change_anticipated,key=attrgetter('fitness'),default=None)
-        max_fitness_ra = max((cl.q*cl.ra for cl in matching_with_change_anticipated), default=0.)
-        max_fitness_rb = max((cl.q*cl.rb for cl in matching_with_change_anticipated), default=0.)
+        matching = self.matching(situation)
+        best_classifier, max_fitness_ra, max_fitness_rb = self._fitness_aggregates(matching)
         # Tmp : Parcours sur matching pour mountaincar
-        return ClassifiersList(*matching), best_classifier, max_fitness_ra, max_fitness_rb
+        return MatchSet(*matching), best_classifier, max_fitness_ra, max_fitness_rb
+
+
+    def _fitness_aggregates(
+            self,
+            matching: List[Classifier]
+        ) -> tuple:
+        """
+        Computes the fittest classifier and the maximal q*ra and q*rb among
+        the classifiers of a match set anticipating a change.
+
+        Parameters
+        ----------
+        matching: List[Classifier]
+            Match set
+
+        Returns
+        ----------
+        tuple
+            Best classifier (or None), max fitness on ra, max fitness on rb
+        """
+        # The aggregates depend on q, ra and rb, which change at every step, so
+        # they are computed in a single pass over the (possibly memoized) match set
+        best_classifier = None
+        max_fitness_ra = max_fitness_rb = 0.
+        for cl in matching:
+            if cl.does_anticipate_change():
+                fitness, fitness_ra, fitness_rb = cl.fitness, cl.q*cl.ra, cl.q*cl.rb
+                if best_classifier is None:
+                    best_classifier, best_fitness = cl, fitness
+                    max_fitness_ra, max_fitness_rb = fitness_ra, fitness_rb
+                    continue
+                if fitness > best_fitness:
+                    best_classifier, best_fitness = cl, fitness
+                if fitness_ra > max_fitness_ra:
+                    max_fitness_ra = fitness_ra
+                if fitness_rb > max_fitness_rb:
+                    max_fitness_rb = fitness_rb
+        return best_classifier, max_fitness_ra, max_fitness_rb
 
 
     def form_action_set(
@@ -97,7 +155,8 @@ class ClassifiersList(TypedList):
             new_list: ClassifiersList,
             p0: Perception,
             time: int,
-            cfg: Configuration
+            cfg: Configuration,
+            lifecycle: Counter = None
         ) -> None:
         candidates = [cl for cl in action_set if cl.ee]
         if len(candidates) < 2:
@@ -110,7 +169,7 @@ class ClassifiersList(TypedList):
                 (cl1.aliased_state == Perception.empty() or cl1.aliased_state == p0) and \
                 (cl2.aliased_state == Perception.empty() or cl2.aliased_state == p0):
                     new_classifier = cl1.merge_with(cl2, p0, time)
-                    add_classifier(new_classifier, action_set, new_list)
+                    count_creation(lifecycle, 'pep', add_classifier(new_classifier, action_set, new_list))
                     break
 
 
@@ -128,7 +187,8 @@ class ClassifiersList(TypedList):
             p1: Perception,
             time: int,
             pai_states_memory,
-            cfg: Configuration
+            cfg: Configuration,
+            lifecycle: Counter = None
         ) -> None:
         # First, try to detect if it is time to detect a pai state - no need to compute this every time
         knowledge_from_match_set = [cl for cl in t_1_match_set if
@@ -156,13 +216,14 @@ class ClassifiersList(TypedList):
                             lists = [x for x in [population, match_set, action_set] if x]
                             for lst in lists:
                                 lst.safe_remove(cl)
+                        count_event(lifecycle, 'removed_pai', len(behavioral_classifiers_to_delete))
 
         # Create new behavioral classifiers
         if p0 in pai_states_memory and len(potential_cls_for_pai) > 0:
             for candidate in potential_cls_for_pai:
                 new_cl = create_behavioral_classifier(penultimate_classifier, candidate, p1, p0, time)
                 if new_cl:
-                    add_classifier(new_cl, t_2_match_set, new_list)
+                    count_creation(lifecycle, 'behavioral', add_classifier(new_cl, t_2_match_set, new_list))
 
 
     @staticmethod
@@ -178,7 +239,9 @@ class ClassifiersList(TypedList):
             p1: Perception,
             time: int,
             pai_states_memory,
-            cfg: Configuration
+            cfg: Configuration,
+            lifecycle: Counter = None,
+            profiler: PhaseProfiler = None
         ) -> None:
         """
         The Anticipatory Learning Process. Handles all updates by the ALP,
@@ -199,6 +262,10 @@ class ClassifiersList(TypedList):
         time: int
         pai_states_memory
         cfg: Configuration
+        lifecycle: Counter
+            Counts of the events of the life of the classifiers, if any
+        profiler: PhaseProfiler
+            Profiler timing PEP and PAI, if any
         """
         new_list = ClassifiersList()
         new_cl: Optional[Classifier] = None
@@ -218,11 +285,13 @@ class ClassifiersList(TypedList):
 
             if cl.does_anticipate_correctly(p0, p1):
                 is_aliasing_detected, new_cl = alp.expected_case(cl, p0, p1, time, cfg)
+                origin = 'expected_case'
                 was_expected_case = True
                 if cfg.bs_max > 0 and penultimate_classifier is not None and is_aliasing_detected:
                     potential_cls_for_pai.append(cl)
             else:
                 new_cl = alp.unexpected_case(cl, p0, p1, time)
+                origin = 'unexpected_case'
 
             if cl.is_inadequate():
                 # Removes classifier from population, match set
@@ -230,28 +299,34 @@ class ClassifiersList(TypedList):
                 lists = [x for x in [population, match_set, action_set] if x]
                 for lst in lists:
                     lst.safe_remove(cl)
+                count_event(lifecycle, 'removed_inadequate')
                 idx -= 1
                 action_set_length -= 1
             idx += 1
 
             if new_cl is not None:
                 if new_cl.does_match(p0):
-                    add_classifier(new_cl, action_set, new_list)
+                    inserted = add_classifier(new_cl, action_set, new_list)
                 else:
-                    add_classifier(new_cl, population, new_list)
+                    inserted = add_classifier(new_cl, population, new_list)
+                count_creation(lifecycle, origin, inserted)
 
         # No classifier anticipated correctly - generate new one through covering
         # only if we are not in the case of classifiers having behavioral sequences
         if not was_expected_case:
             if (len(action_set) > 0 and action_set[0].behavioral_sequence is None) or len(action_set) == 0:
                 new_cl = alp.cover(p0, action, p1, time, cfg)
-                add_classifier(new_cl, action_set, new_list)
+                count_creation(lifecycle, 'cover', add_classifier(new_cl, action_set, new_list))
 
         if cfg.do_pep:
-            ClassifiersList.apply_enhanced_effect_part_check(action_set, new_list, p0, time, cfg)
+            with phase(profiler, 'pep') as timed:
+                timed.size = len(action_set)
+                ClassifiersList.apply_enhanced_effect_part_check(action_set, new_list, p0, time, cfg, lifecycle)
 
         if cfg.bs_max > 0 and penultimate_classifier is not None and len(potential_cls_for_pai) > 0:
-            ClassifiersList.apply_perceptual_aliasing_issue_management(population, t_2_match_set, t_1_match_set, match_set, action_set, penultimate_classifier, potential_cls_for_pai, new_list, p0, p1, time, pai_states_memory, cfg)
+            with phase(profiler, 'pai') as timed:
+                timed.size = len(action_set)
+                ClassifiersList.apply_perceptual_aliasing_issue_management(population, t_2_match_set, t_1_match_set, match_set, action_set, penultimate_classifier, potential_cls_for_pai, new_list, p0, p1, time, pai_states_memory, cfg, lifecycle)
 
         # Merge classifiers from new_list into self and population
         population.extend(new_list)
@@ -272,9 +347,9 @@ class ClassifiersList(TypedList):
             beta_rl: float,
             gamma: float,
         ) -> None:
-        for cl in action_set:
-            #rl.update_classifier_q_learning(cl, reward, max_fitness_ra, beta_rl, gamma)
-            rl.update_classifier_double_q_learning(cl, reward, max_fitness_ra, max_fitness_rb, beta_rl, gamma)
+        #for cl in action_set:
+        #    rl.update_classifier_q_learning(cl, reward, max_fitness_ra, beta_rl, gamma)
+        rl.update_classifiers_double_q_learning(action_set, reward, max_fitness_ra, max_fitness_rb, beta_rl, gamma)
 
 
     @staticmethod
@@ -288,7 +363,8 @@ class ClassifiersList(TypedList):
             theta_ga: int,
             mu: float,
             chi: float,
-            theta_as: int
+            theta_as: int,
+            lifecycle: Counter = None
         ) -> None:
 
         if ga.should_apply(action_set, time, theta_ga):
@@ -328,21 +404,27 @@ class ClassifiersList(TypedList):
                 match_set,
                 action_set,
                 len(unique_children),
-                theta_as
+                theta_as,
+                lifecycle
             )
 
             # check for subsumers / similar classifiers
             for child in unique_children:
-                ga.add_classifier(
+                inserted = ga.add_classifier(
                     child,
                     p1,
                     population,
                     match_set,
                     action_set
                 )
+                count_creation(lifecycle, 'ga', inserted)
 
 
     def __str__(self):
         return "\n".join(str(classifier)
             for classifier
             in sorted(self, key=lambda cl: -cl.fitness))
+
+
+# MatchSet derives from ClassifiersList: imported once the class is defined
+from beacs.agents.beacs.MatchSet import MatchSet
@@ -19,6 +19,8 @@ class Condition(AbstractPerception):
     can be applied.
     """
 
+    __slots__ = ()
+
 
     @property
     def specificity(self) -> int:
@@ -30,7 +32,7 @@ class Condition(AbstractPerception):
         int
             Number of not generic (wildcards) attributes
         """
-        return sum(1 for attr in self if attr != self.wildcard)
+        return len(self._items) - self._items.count(self.wildcard)
 
 
     @property
@@ -43,7 +45,7 @@ class Condition(AbstractPerception):
         int
             Number of generic (wildcards) attributes
         """
-        return sum(1 for attr in self if attr == self.wildcard)
+        return self._items.count(self.wildcard)
 
 
     def specialize_with_condition(
@@ -4,8 +4,9 @@
     file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
-from typing import Callable
+from typing import Callable, Iterable
 
+from beacs import Alphabet
 from beacs.agents import EnvironmentAdapter
 
 
@@ -32,7 +33,11 @@ class Configuration:
             theta_as: int=20,
             mu: float=0.3,
             chi: float=0.8,
-            bs_max: int=0) -> None:
+            bs_max: int=0,
+            population_class: type=None,
+            alphabet: Alphabet=None,
+            do_phase_profiling: bool=False,
+            phase_profiling_history: int=0) -> None:
         """
         Creates the configuration object used during training the beacs agent.
 
@@ -79,11 +84,24 @@ class Configuration:
             GA crossover probability
         bs_max
             maximal length of behavioral sequence
+        population_class
+            ClassifiersList subclass holding the population, such as
+            IndexedClassifiersList. ClassifiersList is used if None
+        alphabet
+            Alphabet coding the perceptions given by the environment adapter.
+            The classifier wildcard becomes the alphabet wildcard code.
+            Symbols are kept as they are if None
+        do_phase_profiling
+            records the wall time, the number of calls and the set sizes of
+            the phases of the trials, added to the metrics
+        phase_profiling_history
+            number of the last trials whose phase statistics are kept by the
+            profiler, apart from the metrics
 
         """
         self.classifier_length = classifier_length
         self.number_of_possible_actions = number_of_possible_actions
-        self.classifier_wildcard = classifier_wildcard
+        self.classifier_wildcard = classifier_wildcard if alphabet is None else Alphabet.WILDCARD
         self.environment_adapter = environment_adapter
         self.metrics_trial_frequency = metrics_trial_frequency
         self.user_metrics_collector_fcn = user_metrics_collector_fcn
@@ -102,6 +120,54 @@ class Configuration:
         self.mu = mu
         self.chi = chi
         self.bs_max = bs_max
+        self.population_class = population_class
+        self.alphabet = alphabet
+        self.do_phase_profiling = do_phase_profiling
+        self.phase_profiling_history = phase_profiling_history
+
+
+    def encode(
+            self,
+            observation: Iterable
+        ):
+        """
+        Codes an observation given by the environment adapter with the
+        alphabet, if any.
+
+        Parameters
+        ----------
+        observation: Iterable
+            Observation in the LCS representation
+
+        Returns
+        -------
+        Observation used by the classifiers
+        """
+        if self.alphabet is None:
+            return observation
+        return self.alphabet.encode(observation)
+
+
+    def decode(
+            self,
+            codes: Iterable
+        ) -> str:
+        """
+        Rebuilds the printable form of an observation used by the classifiers.
+
+        Parameters
+        ----------
+        codes: Iterable
+            Observation used by the classifiers
+
+        Returns
+        -------
+        str
+            Printable observation
+        """
+        if self.alphabet is None:
+            return ''.join(map(str, codes))
+        return ''.join(map(str, self.alphabet.decode(codes)))
 
 
     def __str__(self):
@@ -15,8 +15,10 @@ class Effect(AbstractPerception):
     to be caused by the specified action.
     """
 
-    def __init__(self, observation, wildcard='#'):
-        super().__init__(observation, wildcard)
+    __slots__ = ()
+
+    def __init__(self, observation, wildcard='#', alphabet=None):
+        super().__init__(observation, wildcard, alphabet=alphabet)
 
 
     @property
@@ -67,10 +67,7 @@ class EffectList():
         """
         for oi, oeffect in enumerate(other):
             if oeffect not in self:
-                effect_to_append = Effect.empty(length)
-                for i in range(length):
-                    effect_to_append[i] = oeffect[i]
-                self.effect_list.append(effect_to_append)
+                self.effect_list.append(Effect(oeffect, self.wildcard, alphabet=oeffect.alphabet))
                 self.effect_detailled_counter.append(other.effect_detailled_counter[oi])
             else:
                 ei = self.effect_list.index(oeffect)
@@ -217,9 +214,12 @@ class EffectList():
         result = {}
         for idx, effect in enumerate(self):
             if effect[index] == effect.wildcard:
-                result[int(perception[index])] = result.get(int(perception[index]), 0) + self.effect_detailled_counter[idx] / total_counter
+                attribute = perception[index]
             else:
-                result[int(effect[index])] = result.get(int(effect[index]), 0) + self.effect_detailled_counter[idx] / total_counter
+                attribute = effect[index]
+            if effect.alphabet is not None:
+                attribute = effect.alphabet.symbol(attribute)
+            result[int(attribute)] = result.get(int(attribute), 0) + self.effect_detailled_counter[idx] / total_counter
         return result
 
 
@@ -0,0 +1,278 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List
+
+from beacs import Perception
+from beacs.agents.beacs import Classifier, ClassifiersList
+from beacs.agents.beacs.MatchSet import action_key
+
+
+def iterate_bits(mask: int) -> Iterator[int]:
+    """
+    Yields the positions of the bits set in `mask`, lowest first.
+
+    Parameters
+    ----------
+    mask: int
+        Bitset
+
+    Returns
+    -------
+    Iterator[int]
+        Positions of the set bits
+    """
+    bits = bin(mask)[:1:-1]
+    position = bits.find('1')
+    while position != -1:
+        yield position
+        position = bits.find('1', position + 1)
+
+
+class IndexedClassifiersList(ClassifiersList):
+    """
+    Population of classifiers keeping an inverted index of the condition parts.
+
+    Each classifier is given a slot when inserted. For every attribute position,
+    the index holds the bitset of the slots whose condition has a wildcard at
+    this position and, for every symbol, the bitset of the slots whose condition
+    expects this symbol. The match set of a perception is then the AND of
+    `classifier_length` bitsets instead of a scan of the whole population.
+
+    Slots increase with the insertion order, so that reading the bits of a mask
+    gives the classifiers in the order of the list. Conditions are assumed not
+    to change while classifiers are in the population: `refresh` has to be
+    called otherwise.
+
+    The slots of the classifiers sharing an action and a behavioral sequence are
+    also kept, so that forming an action set of the population, as done when
+    looking for similar or subsuming classifiers, does not scan it.
+
+    Match sets are also memoized by perception. A cached match set is updated
+    when a classifier matching its perception is added, removed or refreshed,
+    so that it always equals the one the index would compute.
+    """
+
+    # Maximal number of perceptions whose match set is memoized
+    match_cache_size = 1024
+
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self.match_cache_hits = 0
+        self.match_cache_misses = 0
+        self._rebuild()
+
+
+    def _rebuild(self) -> None:
+        """
+        Gives new slots to all classifiers and rebuilds the index from scratch.
+        """
+        self._slots = []
+        self._members = {}
+        self._next_slot = 0
+        self._live = 0
+        self._wildcard = None
+        self._wildcards = []
+        self._specific = []
+        self._match_cache = {}
+        self._action_sets = {}
+        for cl in self._items:
+            self._slots.append(self._register(cl))
+
+
+    def _register(
+            self,
+            cl: Classifier
+        ) -> int:
+        """
+        Indexes the condition of a classifier in a new slot.
+
+        Parameters
+        ----------
+        cl: Classifier
+            Classifier to index
+
+        Returns
+        -------
+        int
+            Slot given to the classifier
+        """
+        slot = self._next_slot
+        self._next_slot += 1
+        self._members[slot] = cl
+        bit = 1 << slot
+        self._live |= bit
+        if self._wildcard is None:
+            self._wildcard = cl.condition.wildcard
+            self._wildcards = [0] * len(cl.condition)
+            self._specific = [{} for _ in range(len(cl.condition))]
+        self._index_condition(cl, bit)
+        key = action_key(cl)
+        self._action_sets[key] = self._action_sets.get(key, 0) | bit
+        for situation, entry in self._match_cache.items():
+            if cl.does_match(situation):
+                entry[0] |= bit
+                if entry[1] is not None:
+                    entry[1].append(cl)
+        return slot
+
+
+    def _index_condition(
+            self,
+            cl: Classifier,
+            bit: int
+        ) -> None:
+        for idx, symbol in enumerate(cl.condition):
+            if symbol == self._wildcard:
+                self._wildcards[idx] |= bit
+            else:
+                specific = self._specific[idx]
+                specific[symbol] = specific.get(symbol, 0) | bit
+
+
+    def _unregister(
+            self,
+            slot: int
+        ) -> None:
+        """
+        Removes a slot from the index.
+
+        Parameters
+        ----------
+        slot: int
+            Slot to free
+        """
+        cl = self._members.pop(slot)
+        bit = 1 << slot
+        self._live &= ~bit
+        for idx, symbol in enumerate(cl.condition):
+            if symbol == self._wildcard:
+                self._wildcards[idx] &= ~bit
+            else:
+                self._specific[idx][symbol] &= ~bit
+        key = action_key(cl)
+        self._action_sets[key] &= ~bit
+        if not self._action_sets[key]:
+            del self._action_sets[key]
+        for entry in self._match_cache.values():
+            if entry[0] & bit:
+                entry[0] &= ~bit
+                entry[1] = None
+        # Slots are never reused, renumber them once most of them are free
+        if self._next_slot > 2 * len(self._members) + 1024:
+            self._rebuild()
+
+
+    def refresh(
+            self,
+            cl: Classifier
+        ) -> None:
+        """
+        Updates the index after the condition of `cl` has been modified
+        while it belongs to the population.
+
+        Parameters
+        ----------
+        cl: Classifier
+            Classifier whose condition changed
+        """
+        for slot, member in self._members.items():
+            if member is cl:
+                bit = 1 << slot
+                for idx in range(len(self._wildcards)):
+                    self._wildcards[idx] &= ~bit
+                    specific = self._specific[idx]
+                    for symbol in specific:
+                        specific[symbol] &= ~bit
+                self._index_condition(cl, bit)
+                for situation, entry in self._match_cache.items():
+                    if cl.does_match(situation) != bool(entry[0] & bit):
+                        entry[0] ^= bit
+                        entry[1] = None
+
+
+    def clear_match_cache(self) -> None:
+        """
+        Forgets all memoized match sets and resets the hit/miss counters.
+        """
+        self._match_cache = {}
+        self.match_cache_hits = 0
+        self.match_cache_misses = 0
+
+
+    def _match_mask(
+            self,
+            situation: Perception
+        ) -> int:
+        mask = self._live
+        for wildcards, specific, symbol in zip(self._wildcards, self._specific, situation):
+            if symbol != self._wildcard:
+                mask &= wildcards | specific.get(symbol, 0)
+                if not mask:
+                    break
+        return mask
+
+
+    def matching(
+            self,
+            situation: Perception
+        ) -> List[Classifier]:
+        key = tuple(situation)
+        entry = self._match_cache.get(key)
+        if entry is None:
+            self.match_cache_misses += 1
+            if len(self._match_cache) >= self.match_cache_size:
+                del self._match_cache[next(iter(self._match_cache))]
+            entry = [self._match_mask(situation), None]
+            self._match_cache[key] = entry
+        else:
+            self.match_cache_hits += 1
+        if entry[1] is None:
+            members = self._members
+            entry[1] = [members[slot] for slot in iterate_bits(entry[0])]
+        return entry[1][:]
+
+
+    def form_action_set(
+            self,
+            action_classifier: Classifier
+        ) -> ClassifiersList:
+        members = self._members
+        mask = self._action_sets.get(action_key(action_classifier), 0)
+        return ClassifiersList(*[members[slot] for slot in iterate_bits(mask)])
+
+
+    def insert(self, index: int, o) -> None:
+        super().insert(index, o)
+        if index >= len(self) - 1:
+            self._slots.append(self._register(o))
+        else:
+            self._rebuild()
+
+
+    def __setitem__(self, i, o):
+        super().__setitem__(i, o)
+        self._rebuild()
+
+
+    def __delitem__(self, i):
+        super().__delitem__(i)
+        if isinstance(i, slice):
+            self._rebuild()
+        else:
+            self._unregister(self._slots.pop(i))
+
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._rebuild()
+
+
+    def reverse(self) -> None:
+        self._items.reverse()
+        self._rebuild()
@@ -0,0 +1,320 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+from __future__ import annotations
+
+import pickle
+import random
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from beacs.agents.Agent import TrialMetrics
+from beacs.agents.MetricsSink import MetricsSink
+from beacs.agents.beacs import Configuration
+from beacs.agents.beacs.ClassifierColumns import ClassifierColumns
+from beacs.agents.beacs.components.checkpoint import map_arrays
+from beacs.agents.beacs.components.sampling import random_below
+
+
+def _anticipates_change(arrays: dict) -> np.ndarray:
+    # Whether the most counted effect of every classifier (the first one if
+    # several are) specifies a change, as EffectList.specify_change
+    counts = arrays['effect_counts']
+    if len(counts) == 0:
+        return np.zeros(0, dtype=bool)
+    counters = arrays['effect_detailled_counter']
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    maxima = np.maximum.reduceat(counters, starts)
+    positions = np.where(counters == np.repeat(maxima, counts), np.arange(len(counters)), len(counters))
+    first = np.minimum.reduceat(positions, starts)
+    return (arrays['effects'][first] != 0).any(axis=1)
+
+
+class MappedPopulation:
+    """
+    Read-only population mapped from a checkpoint file, running exploitation
+    trials without learning.
+
+    The columns of the checkpoint are memory maps: every process mapping the
+    same file shares a single copy of the population. Classifiers are never
+    built, a match set being the array of its rows in the order of the
+    population. The classifier is chosen as choose_classifier does, and the
+    coins of the double Q-learning update of the action sets are drawn
+    without updating anything, so that a trial goes as the one of
+    BEACS.exploit with beta_rl=0, which leaves the population as it is.
+    """
+
+    # Maximal number of perceptions whose match set is memoized
+    match_cache_size = 1024
+
+    def __init__(
+            self,
+            path: str,
+            cfg: Optional[Configuration] = None
+        ) -> None:
+        """
+        Parameters
+        ----------
+        path: str
+            Checkpoint written by BEACS.save_checkpoint
+        cfg: Optional[Configuration]
+            Configuration of the exploitation, the one of the checkpoint if
+            None
+        """
+        header, pickled_cfg, arrays = map_arrays(path)
+        self.cfg = cfg if cfg is not None else pickle.loads(pickled_cfg)
+        if self.cfg.classifier_length != header['classifier_length']:
+            raise ValueError("Classifiers of length {} cannot be used with a configuration of length {}".format(
+                header['classifier_length'], self.cfg.classifier_length))
+        self._conditions = arrays['condition']
+        self._actions = arrays['action']
+        self._columns = ClassifierColumns.from_arrays(arrays)
+        self._sequence_lengths = arrays['behavioral_sequence_lengths']
+        self._sequence_starts = np.cumsum(np.maximum(self._sequence_lengths, 0)) - np.maximum(self._sequence_lengths, 0)
+        self._sequences = arrays['behavioral_sequences']
+        self._anticipates_change = _anticipates_change(arrays)
+        # Symbols of the perceptions given by the environment adapter, the
+        # wildcard being 0 and the unknown ones matching wildcards only
+        self._codes = {symbol: code for code, symbol in enumerate(header['symbols'])}
+        self._unknown = len(header['symbols'])
+        self._match_cache = {}
+
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+
+    def match(
+            self,
+            situation
+        ) -> np.ndarray:
+        """
+        Gives the rows of the classifiers matching a situation.
+
+        Parameters
+        ----------
+        situation
+            Perception given by the environment adapter
+
+        Returns
+        -------
+        np.ndarray
+            Rows, in the order of the population
+        """
+        key = tuple(situation)
+        rows = self._match_cache.get(key)
+        if rows is None:
+            codes = [self._codes.get(symbol, self._unknown) for symbol in key]
+            matching = np.ones(len(self), dtype=bool)
+            for position, code in enumerate(codes):
+                if code != 0:
+                    column = self._conditions[:, position]
+                    matching &= (column == 0) | (column == code)
+            rows = np.flatnonzero(matching)
+            if len(self._match_cache) >= self.match_cache_size:
+                del self._match_cache[next(iter(self._match_cache))]
+            self._match_cache[key] = rows
+        return rows
+
+
+    def _classifier(self, row: int) -> Tuple[int, Optional[tuple]]:
+        length = self._sequence_lengths[row]
+        if length < 0:
+            return self._actions[row].item(), None
+        start = self._sequence_starts[row]
+        return self._actions[row].item(), tuple(self._sequences[start:start + length].tolist())
+
+
+    def _random_action(self, rows: np.ndarray) -> Tuple[int, Optional[tuple]]:
+        # As choose_random_classifiers
+        rand = random.randint(0, len(rows) + self.cfg.number_of_possible_actions - 1)
+        if rand < len(rows):
+            return self._classifier(rows[rand])
+        return rand - len(rows), None
+
+
+    def _latest_action(self, rows: np.ndarray) -> Tuple[int, Optional[tuple]]:
+        # As choose_latest_action
+        if len(rows) == 0:
+            return self._random_action(rows)
+        actions = self._actions[rows]
+        numerosities = np.bincount(actions, weights=self._columns.num[rows], minlength=self.cfg.number_of_possible_actions)
+        for action in range(self.cfg.number_of_possible_actions):
+            if numerosities[action] == 0:
+                return action, None
+        return self._classifier(rows[np.argmin(self._columns.talp[rows])])
+
+
+    def _least_known_action(self, rows: np.ndarray) -> Tuple[int, Optional[tuple]]:
+        # As choose_action_from_knowledge_array
+        if len(rows) == 0:
+            return self._random_action(rows)
+        knowledge_array = {i: 0.0 for i in range(self.cfg.number_of_possible_actions)}
+        actions = self._actions[rows]
+        num = self._columns.num[rows]
+        agg_q = np.bincount(actions, weights=self._columns.q[rows] * num)
+        agg_num = np.bincount(actions, weights=num)
+        for _action in dict.fromkeys(actions.tolist()):
+            knowledge_array[_action] = agg_q[_action].item() / agg_num[_action].item()
+        action = sorted(knowledge_array.items(), key=lambda el: el[1])[0][0]
+        candidates = rows[actions == action]
+        if len(candidates) > 0:
+            return self._classifier(candidates[random.randint(0, len(candidates) - 1)])
+        return self._random_action(rows[np.argsort(actions, kind='stable')])
+
+
+    def _fittest_action(self, rows: np.ndarray) -> Tuple[int, Optional[tuple]]:
+        # As choose_fittest_classifier
+        if len(rows) == 0:
+            return self._random_action(rows)
+        anticipating = rows[self._anticipates_change[rows]]
+        candidates = anticipating if len(anticipating) > 0 else rows
+        fitness = self._columns.fitness(candidates, np.maximum(self._sequence_lengths[candidates], 0), self.cfg.bs_max)
+        return self._classifier(candidates[np.argmax(fitness)])
+
+
+    def action_set_size(
+            self,
+            rows: np.ndarray,
+            action: int,
+            behavioral_sequence: Optional[tuple]
+        ) -> int:
+        """
+        Gives the number of classifiers of a match set in the action set of
+        a chosen classifier, as form_action_set.
+
+        Parameters
+        ----------
+        rows: np.ndarray
+            Match set
+        action: int
+            Action of the chosen classifier
+        behavioral_sequence: Optional[tuple]
+            Behavioral sequence of the chosen classifier
+
+        Returns
+        -------
+        int
+            Size of the action set
+        """
+        candidates = rows[self._actions[rows] == action]
+        if behavioral_sequence is None:
+            return int(np.count_nonzero(self._sequence_lengths[candidates] < 0))
+        return sum(1 for row in candidates.tolist() if self._classifier(row)[1] == behavioral_sequence)
+
+
+    def choose_action(
+            self,
+            rows: np.ndarray,
+            epsilon: float
+        ) -> Tuple[int, Optional[tuple]]:
+        """
+        Chooses a classifier of a match set through the epsilon greedy
+        method of choose_classifier.
+
+        Parameters
+        ----------
+        rows: np.ndarray
+            Match set
+        epsilon: float
+            Probability of executing exploration path
+
+        Returns
+        -------
+        Tuple[int, Optional[tuple]]
+            Action and behavioral sequence of the chosen classifier
+        """
+        if random.random() < epsilon:
+            rand = random.random()
+            if rand < 0.5:
+                return self._random_action(rows)
+            elif rand < 0.75:
+                return self._least_known_action(rows)
+            return self._latest_action(rows)
+        return self._fittest_action(rows)
+
+
+    def run_trial_exploit(self, env) -> TrialMetrics:
+        """
+        Runs an exploitation trial, as BEACS does with beta_rl=0.
+
+        Parameters
+        ----------
+        env
+            Environment
+
+        Returns
+        -------
+        TrialMetrics
+            Steps and reward of the trial
+        """
+        adapter = self.cfg.environment_adapter
+        steps = 0
+        total_reward = 0
+        state = adapter.to_genotype(env, env.reset())
+        action_set_size = 0
+        done = False
+        while not done:
+            rows = self.match(state)
+            if steps > 0:
+                # Coins of the reinforcement learning of the last action set
+                random_below(action_set_size, 0.5)
+            action, behavioral_sequence = self.choose_action(rows, self.cfg.epsilon)
+            action_set_size = self.action_set_size(rows, action, behavioral_sequence)
+            raw_state, last_reward, done, _ = env.step(adapter.to_lcs_action(env, action))
+            total_reward += last_reward
+            state = adapter.to_genotype(env, raw_state)
+            if not done and behavioral_sequence:
+                for act in behavioral_sequence:
+                    raw_state, last_reward, done, _ = env.step(adapter.to_lcs_action(env, act))
+                    total_reward += last_reward
+                    state = adapter.to_genotype(env, raw_state)
+                    if done:
+                        break
+                    steps += 1
+            if done:
+                random_below(action_set_size, 0.5)
+            steps += 1
+        return TrialMetrics(steps, total_reward)
+
+
+    def exploit(
+            self,
+            env,
+            trials: int,
+            metrics_sink: MetricsSink = None
+        ) -> List[dict]:
+        """
+        Runs exploitation trials.
+
+        Parameters
+        ----------
+        env
+            Environment
+        trials: int
+            Number of trials
+        metrics_sink: MetricsSink
+            Sink the metrics are written to as they are collected, instead
+            of being returned
+
+        Returns
+        -------
+        List[dict]
+            Basic metrics of the trials, every metrics_trial_frequency trials
+        """
+        metrics = []
+        for trial in range(1, trials + 1):
+            steps, reward = self.run_trial_exploit(env)
+            if trial % self.cfg.metrics_trial_frequency == 0:
+                m = {'trial': trial, 'steps_in_trial': steps, 'reward': reward}
+                if metrics_sink is None:
+                    metrics.append(m)
+                else:
+                    metrics_sink.write(m)
+        if metrics_sink is not None:
+            metrics_sink.flush()
+        return metrics
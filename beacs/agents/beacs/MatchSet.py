@@ -0,0 +1,98 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+from beacs.agents.beacs import Classifier
+from beacs.agents.beacs.ClassifiersList import ClassifiersList
+
+
+def action_key(cl: Classifier) -> Tuple[int, Optional[tuple]]:
+    """
+    Gives the key of the action set a classifier belongs to.
+
+    Parameters
+    ----------
+    cl: Classifier
+        Classifier
+
+    Returns
+    -------
+    Tuple[int, Optional[tuple]]
+        Action and behavioral sequence of the classifier
+    """
+    return cl.action, cl.behavioral_sequence
+
+
+class MatchSet(ClassifiersList):
+    """
+    Match set keeping its classifiers in buckets by action and behavioral
+    sequence. A bucket holds its classifiers in the order of the list, so that
+    the action set of a chosen classifier is a lookup instead of a scan.
+
+    The action and the behavioral sequence of a classifier are assumed not to
+    change while it belongs to the match set.
+    """
+
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self._rebuild()
+
+
+    def _rebuild(self) -> None:
+        self._buckets = {}
+        for cl in self._items:
+            self._buckets.setdefault(action_key(cl), []).append(cl)
+
+
+    def form_action_set(
+            self,
+            action_classifier: Classifier
+        ) -> ClassifiersList:
+        return ClassifiersList(*self._buckets.get(action_key(action_classifier), ()))
+
+
+    def insert(self, index: int, o) -> None:
+        super().insert(index, o)
+        if index >= len(self) - 1:
+            self._buckets.setdefault(action_key(o), []).append(o)
+        else:
+            self._rebuild()
+
+
+    def __setitem__(self, i, o):
+        super().__setitem__(i, o)
+        self._rebuild()
+
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            super().__delitem__(i)
+            self._rebuild()
+            return
+        cl = self._items[i]
+        super().__delitem__(i)
+        key = action_key(cl)
+        bucket = self._buckets[key]
+        # Duplicates are the same object, removing any of them keeps the order
+        for idx, member in enumerate(bucket):
+            if member is cl:
+                del bucket[idx]
+                break
+        if not bucket:
+            del self._buckets[key]
+
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._rebuild()
+
+
+    def reverse(self) -> None:
+        self._items.reverse()
+        self._rebuild()
@@ -90,7 +90,8 @@ class PMark(TypedList):
         """
         diff = Condition.empty(
             wildcard=self.cfg.classifier_wildcard,
-            length=self.cfg.classifier_length
+            length=self.cfg.classifier_length,
+            alphabet=self.cfg.alphabet
         )
         # Count difference types
         nr1, nr2 = 0, 0
@@ -131,11 +132,11 @@ class PMark(TypedList):
     def __repr__(self):
         def compact_set_str(s):
             if len(s) == 0:
-                return self.cfg.classifier_wildcard
+                return self.cfg.decode([self.cfg.classifier_wildcard])
             elif len(s) == 1:
-                return next(iter(s))  # the only element in set
+                return self.cfg.decode(s)  # the only element in set
             else:
-                return '{' + ' '.join(x for x in s) + '}'
+                return '{' + ' '.join(self.cfg.decode([x]) for x in s) + '}'
 
         if self.is_marked():
             return ''.join(compact_set_str(x) for x in self)
@@ -5,4 +5,8 @@ from .EffectList import EffectList
 from .PMark import PMark
 from .Classifier import Classifier
 from .ClassifiersList import ClassifiersList
+from .MatchSet import MatchSet
+from .IndexedClassifiersList import IndexedClassifiersList
+from .ArrayClassifiersList import ArrayClassifiersList
 from .BEACS import BEACS
+from .MappedPopulation import MappedPopulation
@@ -5,9 +5,10 @@
 """
 
 import random
-from itertools import groupby
+import numpy as np
 
 from beacs.agents.beacs import Classifier
+from beacs.agents.beacs.ClassifierColumns import gather
 
 
 def choose_classifier(
@@ -94,11 +95,13 @@ def choose_latest_action(
     last_executed_cls = None
     number_of_cls_per_action = {i: 0 for i in range(cfg.number_of_possible_actions)}
     if len(cll) > 0:
-        last_executed_cls = min(cll, key=lambda cl: cl.talp)
+        # One pass, in the order of the list: the first least recent classifier
+        # and the numerosity of each action
+        for cl in cll:
+            if last_executed_cls is None or cl.talp < last_executed_cls.talp:
+                last_executed_cls = cl
+            number_of_cls_per_action[cl.action] = number_of_cls_per_action.get(cl.action, 0) + cl.num
         # If there are some actions with no classifiers - select them
-        cll.sort(key=lambda cl: cl.action)
-        for _action, _clss in groupby(cll, lambda cl: cl.action):
-            number_of_cls_per_action[_action] = sum([cl.num for cl in _clss])
         for action, nCls in number_of_cls_per_action.items():
             if nCls == 0:
                 return Classifier(action=action, cfg=cfg)
@@ -130,13 +133,22 @@ def choose_action_from_knowledge_array(
     knowledge_array = {i: 0.0 for i in range(cfg.number_of_possible_actions)}
 
     if len(cll) > 0:
-        cll.sort(key=lambda cl: cl.action)
-
-        for _action, _clss in groupby(cll, lambda cl: cl.action):
-            _classifiers = [cl for cl in _clss]
-            agg_q = sum(cl.q * cl.num for cl in _classifiers)
-            agg_num = sum(cl.num for cl in _classifiers)
-            knowledge_array[_action] = agg_q / float(agg_num)
+        # Sums per action are accumulated in the order of the list
+        columns = gather(cll, 'q', 'num')
+        if columns is not None:
+            q, num = columns
+            actions = np.array([cl.action for cl in cll], dtype=np.intp)
+            agg_q = np.bincount(actions, weights=q * num)
+            agg_num = np.bincount(actions, weights=num)
+            for _action in dict.fromkeys(actions.tolist()):
+                knowledge_array[_action] = agg_q[_action].item() / agg_num[_action].item()
+        else:
+            agg_q, agg_num = {}, {}
+            for cl in cll:
+                agg_q[cl.action] = agg_q.get(cl.action, 0) + cl.q * cl.num
+                agg_num[cl.action] = agg_num.get(cl.action, 0) + cl.num
+            for _action in agg_q:
+                knowledge_array[_action] = agg_q[_action] / float(agg_num[_action])
         by_quality = sorted(knowledge_array.items(), key=lambda el: el[1])
         action = by_quality[0][0]
 
@@ -145,6 +157,9 @@ def choose_action_from_knowledge_array(
             idx = random.randint(0, len(classifiers_that_match_action) -1)
             return classifiers_that_match_action[idx]
 
+        # The match set is left untouched, the draw is done among the classifiers grouped by action
+        return choose_random_classifiers(sorted(cll, key=lambda cl: cl.action), cfg)
+
     return choose_random_classifiers(cll, cfg)
 
 
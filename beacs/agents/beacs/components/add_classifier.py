@@ -5,7 +5,7 @@ def add_classifier(
         child, 
         population,
         new_list
-    ) -> None:
+    ) -> bool:
     """
     Looks for subsuming / similar classifiers in the population of classifiers
     and those created in the current ALP run (`new_list`).
@@ -18,15 +18,21 @@ def add_classifier(
     child:
         New classifier to examine
     population:
-        List of classifiers
+        ClassifiersList of classifiers
     new_list:
         A list of newly created classifiers in this ALP run
+
+    Returns
+    -------
+    bool
+        True if `child` was added to `new_list`
     """
     old_cl = None
     equal_cl = None
 
-    # Look if there is a classifier that subsumes the insertion candidate
-    for cl in population:
+    # Look if there is a classifier that subsumes the insertion candidate,
+    # only those having the same action and behavioral sequence can
+    for cl in population.form_action_set(child):
         if does_subsume(cl, child):
             if old_cl is None or cl.is_more_general(old_cl):
                 old_cl = cl
@@ -46,5 +52,6 @@ def add_classifier(
 
     if old_cl is None:
         new_list.append(child)
-    else:
-        old_cl.increase_quality()
+        return True
+    old_cl.increase_quality()
+    return False
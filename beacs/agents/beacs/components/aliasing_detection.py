@@ -6,6 +6,7 @@
 
 from beacs import Perception
 from beacs.agents.beacs import ClassifiersList, Condition, Configuration, Effect, PMark
+from beacs.agents.beacs.ClassifierColumns import assign, gather
 
 
 def is_state_aliased(
@@ -32,11 +33,18 @@ def is_state_aliased(
         True if the state p0 is aliased
     """
     if mark.one_situation_in_mark():
-        situation = Condition(condition)
-        for idx, item in enumerate(condition):
-            if item == condition.wildcard:
-                situation[idx] = ''.join(str(s) for s in mark[idx])
-        return situation.does_match(p0)
+        # The situation is the condition whose wildcards are replaced by the
+        # single symbol of the mark, an unmarked attribute matching nothing
+        wildcard = condition.wildcard
+        for item, marked, p0_item in zip(condition, mark, p0):
+            if p0_item == wildcard:
+                continue
+            if item == wildcard:
+                if p0_item not in marked:
+                    return False
+            elif item != p0_item:
+                return False
+        return True
     return False
 
 
@@ -67,8 +75,14 @@ def should_pai_detection_apply(
     if match_set is None:
         return False
 
-    overall_time = sum(cl.tbseq * cl.num for cl in match_set)
-    overall_num = sum(cl.num for cl in match_set)
+    columns = gather(match_set, 'tbseq', 'num')
+    if columns is not None:
+        tbseq, num = columns
+        overall_time = int((tbseq * num).sum())
+        overall_num = int(num.sum())
+    else:
+        overall_time = sum(cl.tbseq * cl.num for cl in match_set)
+        overall_num = sum(cl.num for cl in match_set)
 
     if overall_num == 0:
         return False
@@ -97,6 +111,8 @@ def set_pai_detection_timestamps(
     epoch: int
         Current epoch
     """
+    if assign(match_set, 'tbseq', epoch):
+        return
     for cl in match_set:
         cl.tbseq = epoch
 
@@ -187,6 +203,8 @@ def is_perceptual_aliasing_state(
                 anticipation[idx] = ei
         return tuple(anticipation)
 
+    # Anticipations are tuples, so is p0 when coded as bytes by an alphabet
+    p0 = tuple(p0)
     nbr_of_actions = cfg.number_of_possible_actions
     nbr_of_expected_transitions = nbr_of_actions
     #Approximate the number of expected transitions and the reachable states
@@ -93,9 +93,11 @@ def create_behavioral_classifier(
         if cl.behavioral_sequence: 
             nb_of_action += len(cl.behavioral_sequence)
         if nb_of_action <= cl.cfg.bs_max:
+            behavioral_sequence = (penultimate_classifier.behavioral_sequence or ()) + \
+                (cl.action,) + (cl.behavioral_sequence or ())
             child = Classifier(
                 action=penultimate_classifier.action, 
-                behavioral_sequence=[],
+                behavioral_sequence=behavioral_sequence,
                 rewarda=cl.ra,
                 rewardb=cl.rb,
                 tga=time,
@@ -104,11 +106,6 @@ def create_behavioral_classifier(
                 pai_state=pai_state,
                 cfg=cl.cfg
             )
-            if penultimate_classifier.behavioral_sequence:
-                child.behavioral_sequence.extend(penultimate_classifier.behavioral_sequence)
-            child.behavioral_sequence.append(cl.action)
-            if cl.behavioral_sequence:
-                child.behavioral_sequence.extend(cl.behavioral_sequence)
             # Passthrough operation on child condition was not used because it can create not relevant classifiers. We prefer setting up the child condition the same as the penultimate activated classifier.
             # Thus, we garantee the creation of a classifier that can be used within the environment.
             child.condition.specialize_with_condition(penultimate_classifier.condition)
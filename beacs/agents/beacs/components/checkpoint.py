@@ -0,0 +1,497 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+import gc
+import json
+import mmap
+import pickle
+import random
+import struct
+from collections import Counter, namedtuple
+from itertools import chain, islice, repeat
+from operator import attrgetter
+from typing import BinaryIO, Iterable, List, Optional, Union
+
+import numpy as np
+
+from beacs import Alphabet, Perception
+from beacs.agents.beacs import Classifier, Condition, Configuration, Effect, EffectList, PMark
+from beacs.agents.beacs.ClassifierColumns import NUMERICAL_PARAMETERS, gather
+
+# A checkpoint starts with MAGIC, then VERSION, the length of the JSON header
+# and the length of the pickled configuration as little endian unsigned
+# integers, the JSON header, the pickled configuration and the arrays listed
+# in the header, in the NumPy .npy format. Every array starts on a multiple of
+# ALIGNMENT bytes.
+MAGIC = b'BEACSCKP'
+VERSION = 1
+ALIGNMENT = 64
+_PRELUDE = struct.Struct('<IQQ')
+
+# Content of a checkpoint, the classifiers being plain ones using `cfg`
+Checkpoint = namedtuple('Checkpoint', ['cfg', 'classifiers', 'pai_states_memory', 'lifecycle'])
+
+
+class _SymbolTable:
+    """
+    Codes the symbols of the perceptions as integers, the wildcard being 0.
+    Symbols already coded by an alphabet keep their codes.
+    """
+
+    def __init__(
+            self,
+            cfg: Configuration
+        ) -> None:
+        self.alphabet = cfg.alphabet
+        if self.alphabet is None:
+            self.symbols = [cfg.classifier_wildcard]
+            self.codes = {cfg.classifier_wildcard: 0}
+
+
+    def _code(self, symbol) -> int:
+        code = self.codes.get(symbol)
+        if code is None:
+            code = len(self.symbols)
+            self.symbols.append(symbol)
+            self.codes[symbol] = code
+        return code
+
+
+    def encode(
+            self,
+            symbols: List
+        ) -> np.ndarray:
+        """
+        Codes a flat list of symbols, or of codes of the alphabet.
+        """
+        if self.alphabet is not None:
+            return np.array(symbols, dtype=np.uint8)
+        try:
+            joined = ''.join(symbols)
+        except TypeError:
+            joined = None
+        if joined is not None and len(joined) == len(symbols):
+            # Single characters, coded through their code points
+            points = np.frombuffer(joined.encode('utf-32-le'), dtype='<u4')
+            if len(points) == 0:
+                return np.zeros(0, dtype=np.int64)
+            lut = np.zeros(int(points.max()) + 1, dtype=np.int64)
+            present = np.zeros(len(lut), dtype=bool)
+            present[points] = True
+            for point in np.flatnonzero(present).tolist():
+                lut[point] = self._code(chr(point))
+            return lut[points]
+        return np.array([self._code(symbol) for symbol in symbols], dtype=np.int64)
+
+
+    def encode_buffers(
+            self,
+            buffers: List
+        ) -> np.ndarray:
+        """
+        Codes the attributes of several perceptions, one after the other.
+        """
+        if self.alphabet is not None:
+            return np.frombuffer(b''.join(buffers), dtype=np.uint8)
+        return self.encode(list(chain.from_iterable(buffers)))
+
+
+    @property
+    def table(self) -> List:
+        """
+        Symbol of every code, the first one being the wildcard.
+        """
+        if self.alphabet is not None:
+            return self.alphabet.decode(range(len(self.alphabet)))
+        return self.symbols
+
+
+def _codes_dtype(symbols: int):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if symbols <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def _states(
+        table: _SymbolTable,
+        states: List
+    ):
+    # Lengths and coded attributes of perceptions, possibly empty
+    lengths = [len(state) for state in states]
+    convert = bytes if table.alphabet is not None else tuple
+    buffers = [convert(state) for state, size in zip(states, lengths) if size]
+    return np.array(lengths, dtype=np.int32), table.encode_buffers(buffers)
+
+
+def _pad(file: BinaryIO) -> None:
+    padding = -file.tell() % ALIGNMENT
+    if padding:
+        file.write(b'\0' * padding)
+
+
+def write_checkpoint(
+        file: Union[str, BinaryIO],
+        cfg: Configuration,
+        population: Iterable[Classifier],
+        pai_states_memory: List,
+        lifecycle: Optional[Counter] = None
+    ) -> None:
+    """
+    Writes the state of an agent in a checkpoint: its classifiers, stored
+    column by column, its memory of the aliased states, the counts of the
+    life of its classifiers and the states of the random generators of
+    Python and NumPy. The configuration is pickled once.
+
+    Parameters
+    ----------
+    file: Union[str, BinaryIO]
+        Path or binary file open for writing
+    cfg: Configuration
+        Configuration of the agent
+    population: Iterable[Classifier]
+        Classifiers
+    pai_states_memory: List
+        Aliased states
+    lifecycle: Optional[Counter]
+        Counts of the events of the life of the classifiers, if any
+    """
+    if isinstance(file, str):
+        with open(file, 'wb') as checkpoint_file:
+            return write_checkpoint(checkpoint_file, cfg, population, pai_states_memory, lifecycle)
+
+    population = list(population)
+    n = len(population)
+    length = cfg.classifier_length
+    table = _SymbolTable(cfg)
+    arrays = {}
+
+    columns = gather(population, *NUMERICAL_PARAMETERS)
+    for idx, (name, dtype) in enumerate(NUMERICAL_PARAMETERS.items()):
+        arrays[name] = columns[idx] if columns is not None else \
+            np.fromiter(map(attrgetter(name), population), dtype=dtype, count=n)
+    arrays['action'] = np.fromiter(map(attrgetter('action'), population), dtype=np.int64, count=n)
+    arrays['ee'] = np.fromiter(map(attrgetter('ee'), population), dtype=bool, count=n)
+
+    sequences = [cl.behavioral_sequence for cl in population]
+    arrays['behavioral_sequence_lengths'] = np.fromiter(
+        (len(sequence) if sequence is not None else -1 for sequence in sequences), dtype=np.int32, count=n)
+    arrays['behavioral_sequences'] = np.fromiter(
+        chain.from_iterable(sequence for sequence in sequences if sequence is not None), dtype=np.int64)
+
+    arrays['condition'] = table.encode_buffers([cl.condition._items for cl in population]).reshape(n, length)
+    effect_lists = [cl.effect for cl in population]
+    arrays['effect_counts'] = np.fromiter(map(len, effect_lists), dtype=np.int32, count=n)
+    effects = [effect._items for effect_list in effect_lists for effect in effect_list.effect_list]
+    arrays['effects'] = table.encode_buffers(effects).reshape(len(effects), length)
+    arrays['effect_detailled_counter'] = np.fromiter(
+        chain.from_iterable(effect_list.effect_detailled_counter for effect_list in effect_lists), dtype=np.int64)
+    arrays['enhanced_trace_ga'] = np.fromiter(
+        chain.from_iterable(effect_list.enhanced_trace_ga for effect_list in effect_lists),
+        dtype=bool, count=n * length).reshape(n, length)
+
+    marks = list(chain.from_iterable(cl.mark._items for cl in population))
+    arrays['mark_sizes'] = np.fromiter(map(len, marks), dtype=np.int64, count=len(marks)).reshape(n, length)
+    arrays['mark_symbols'] = table.encode(list(chain.from_iterable(marks)))
+
+    for name in ('aliased_state', 'pai_state'):
+        arrays[name + '_lengths'], arrays[name + 's'] = _states(table, [getattr(cl, name) for cl in population])
+    arrays['pai_states_memory_lengths'], arrays['pai_states_memory'] = _states(table, pai_states_memory)
+
+    # All the symbols are known at last
+    codes_dtype = _codes_dtype(len(table.table))
+    for name in ('condition', 'effects', 'mark_sizes', 'mark_symbols', 'aliased_states', 'pai_states', 'pai_states_memory'):
+        arrays[name] = arrays[name].astype(codes_dtype, copy=False)
+
+    python_version, python_state, python_gauss = random.getstate()
+    arrays['python_random_state'] = np.array(python_state, dtype=np.int64)
+    numpy_name, numpy_keys, numpy_pos, numpy_has_gauss, numpy_gauss = np.random.get_state()
+    arrays['numpy_random_state'] = np.asarray(numpy_keys, dtype=np.uint32)
+
+    header = json.dumps({
+        'classifiers': n,
+        'classifier_length': length,
+        'alphabet': cfg.alphabet is not None,
+        'symbols': table.table,
+        'lifecycle': dict(lifecycle) if lifecycle is not None else {},
+        'python_random': [python_version, python_gauss],
+        'numpy_random': [numpy_name, numpy_pos, numpy_has_gauss, numpy_gauss],
+        'arrays': list(arrays)
+    }).encode()
+    pickled_cfg = pickle.dumps(cfg, protocol=pickle.HIGHEST_PROTOCOL)
+
+    file.write(MAGIC)
+    file.write(_PRELUDE.pack(VERSION, len(header), len(pickled_cfg)))
+    file.write(header)
+    file.write(pickled_cfg)
+    for array in arrays.values():
+        _pad(file)
+        np.lib.format.write_array(file, np.ascontiguousarray(array), allow_pickle=False)
+
+
+def read_header(file: BinaryIO) -> tuple:
+    """
+    Reads the start of a checkpoint, up to its first array.
+
+    Parameters
+    ----------
+    file: BinaryIO
+        Binary file open for reading, at the start of the checkpoint
+
+    Returns
+    -------
+    tuple
+        The JSON header and the pickled configuration
+    """
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a BEACS checkpoint")
+    version, header_length, cfg_length = _PRELUDE.unpack(file.read(_PRELUDE.size))
+    if version != VERSION:
+        raise ValueError("Unsupported checkpoint version {}, expected {}".format(version, VERSION))
+    header = json.loads(file.read(header_length).decode())
+    pickled_cfg = file.read(cfg_length)
+    return header, pickled_cfg
+
+
+def read_arrays(
+        file: BinaryIO,
+        header: dict
+    ) -> dict:
+    """
+    Reads the arrays of a checkpoint, following its header.
+
+    Parameters
+    ----------
+    file: BinaryIO
+        Binary file open for reading, past the header
+    header: dict
+        JSON header of the checkpoint
+
+    Returns
+    -------
+    dict
+        Arrays by name
+    """
+    arrays = {}
+    for name in header['arrays']:
+        padding = -file.tell() % ALIGNMENT
+        if padding:
+            file.read(padding)
+        arrays[name] = np.lib.format.read_array(file, allow_pickle=False)
+    return arrays
+
+
+def map_arrays(path: str) -> tuple:
+    """
+    Maps the arrays of a checkpoint file in memory, read-only and without
+    copying them: the processes mapping the same file share its pages.
+
+    Parameters
+    ----------
+    path: str
+        Path of the checkpoint
+
+    Returns
+    -------
+    tuple
+        The JSON header, the pickled configuration and the arrays by name
+    """
+    with open(path, 'rb') as file:
+        header, pickled_cfg = read_header(file)
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        arrays = {}
+        for name in header['arrays']:
+            file.seek(-file.tell() % ALIGNMENT, 1)
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+            count = int(np.prod(shape))
+            offset = file.tell()
+            if count:
+                array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            else:
+                array = np.empty(0, dtype=dtype)
+                array.flags.writeable = False
+            arrays[name] = array.reshape(shape, order='F' if fortran_order else 'C')
+            file.seek(offset + count * dtype.itemsize)
+    return header, pickled_cfg, arrays
+
+
+def _decoder(
+        header: dict,
+        cfg: Configuration
+    ):
+    # Function rebuilding the attributes of perceptions from the codes of
+    # the checkpoint, as lists of symbols or as bytes of the alphabet of cfg
+    symbols = list(header['symbols'])
+    if cfg.alphabet is not None:
+        if header['alphabet'] and len(symbols) <= len(cfg.alphabet) and \
+                symbols == cfg.alphabet.decode(range(len(symbols))):
+            return lambda codes: codes.astype(np.uint8, copy=False).tobytes()
+        lut = np.array([Alphabet.WILDCARD] + [cfg.alphabet.code(symbol) for symbol in symbols[1:]], dtype=np.uint8)
+        return lambda codes: lut[codes].tobytes()
+    symbols[0] = cfg.classifier_wildcard
+    table = np.empty(len(symbols), dtype=object)
+    table[:] = symbols
+    return lambda codes: table[codes].tolist()
+
+
+def _split(
+        items,
+        lengths: List[int]
+    ) -> List:
+    # Cuts a flat sequence in consecutive pieces of the given lengths
+    pieces = []
+    start = 0
+    for length in lengths:
+        pieces.append(items[start:start + length])
+        start += length
+    return pieces
+
+
+def _build_classifiers(
+        header: dict,
+        arrays: dict,
+        cfg: Configuration
+    ) -> tuple:
+    # Classifiers and aliased states of a checkpoint
+    n = header['classifiers']
+    length = header['classifier_length']
+    decode = _decoder(header, cfg)
+    alphabet = cfg.alphabet
+    wildcard = cfg.classifier_wildcard
+
+    if alphabet is not None:
+        def _perceptions(codes, lengths):
+            buffer = decode(codes)
+            return [bytes(piece) for piece in _split(buffer, lengths)]
+        def _items(buffer):
+            return bytearray(buffer)
+    else:
+        def _perceptions(codes, lengths):
+            return [tuple(piece) for piece in _split(decode(codes), lengths)]
+        def _items(symbols):
+            return symbols
+
+    empty = Perception.empty()
+    def _read_states(name, lengths_name):
+        lengths = arrays[lengths_name].tolist()
+        states = _perceptions(arrays[name], lengths)
+        return [state if size else empty for state, size in zip(states, lengths)]
+
+    conditions = _split(decode(arrays['condition'].reshape(-1)), [length] * n)
+    effects = _split(decode(arrays['effects'].reshape(-1)), [length] * len(arrays['effects']))
+    effect_counts = arrays['effect_counts'].tolist()
+    effects_by_classifier = _split(effects, effect_counts)
+    counters_by_classifier = _split(arrays['effect_detailled_counter'].tolist(), effect_counts)
+    traces = arrays['enhanced_trace_ga'].tolist()
+
+    mark_sets = [set() for _ in repeat(None, n * length)]
+    mark_sizes = arrays['mark_sizes'].reshape(-1)
+    marked = np.flatnonzero(mark_sizes)
+    # Symbols, or codes when iterating over the bytes of an alphabet
+    members = iter(decode(arrays['mark_symbols']))
+    for idx, size in zip(marked.tolist(), mark_sizes[marked].tolist()):
+        mark_sets[idx].update(islice(members, size))
+    marks = _split(mark_sets, [length] * n)
+
+    sequence_lengths = arrays['behavioral_sequence_lengths'].tolist()
+    sequences = iter(_split(arrays['behavioral_sequences'].tolist(), [max(size, 0) for size in sequence_lengths]))
+    aliased_states = _read_states('aliased_states', 'aliased_state_lengths')
+    pai_states = _read_states('pai_states', 'pai_state_lengths')
+    numericals = [arrays[name].tolist() for name in NUMERICAL_PARAMETERS]
+    actions = arrays['action'].tolist()
+    ees = arrays['ee'].tolist()
+
+    classifiers = []
+    for idx in range(n):
+        cl = Classifier.__new__(Classifier)
+        cl.cfg = cfg
+        condition = Condition.__new__(Condition)
+        condition._items, condition.wildcard, condition.alphabet = _items(conditions[idx]), wildcard, alphabet
+        cl.condition = condition
+        cl.action = actions[idx]
+        sequence = next(sequences)
+        cl.behavioral_sequence = tuple(sequence) if sequence_lengths[idx] >= 0 else None
+        effect_list = EffectList.__new__(EffectList)
+        effect_list.effect_list = []
+        for items in effects_by_classifier[idx]:
+            effect = Effect.__new__(Effect)
+            effect._items, effect.wildcard, effect.alphabet = _items(items), wildcard, alphabet
+            effect_list.effect_list.append(effect)
+        effect_list.effect_detailled_counter = counters_by_classifier[idx]
+        effect_list.enhanced_trace_ga = traces[idx]
+        effect_list.wildcard = wildcard
+        cl.effect = effect_list
+        mark = PMark.__new__(PMark)
+        mark._items, mark.oktypes, mark.cfg = marks[idx], (set,), cfg
+        cl.mark = mark
+        for name, values in zip(NUMERICAL_PARAMETERS, numericals):
+            setattr(cl, name, values[idx])
+        cl.ee = ees[idx]
+        cl.aliased_state = aliased_states[idx]
+        cl.pai_state = pai_states[idx]
+        classifiers.append(cl)
+
+    return classifiers, _read_states('pai_states_memory', 'pai_states_memory_lengths')
+
+
+def read_checkpoint(
+        file: Union[str, BinaryIO],
+        cfg: Optional[Configuration] = None,
+        restore_random_state: bool = True
+    ) -> Checkpoint:
+    """
+    Reads a checkpoint written by write_checkpoint.
+
+    Parameters
+    ----------
+    file: Union[str, BinaryIO]
+        Path or binary file open for reading
+    cfg: Optional[Configuration]
+        Configuration given to the classifiers instead of the pickled one,
+        such as the one of an exploitation, the classifier lengths having to
+        match
+    restore_random_state: bool
+        Restores the states of the random generators of Python and NumPy
+
+    Returns
+    -------
+    Checkpoint
+        Configuration, classifiers, aliased states and counts of the events
+        of the life of the classifiers
+    """
+    if isinstance(file, str):
+        with open(file, 'rb') as checkpoint_file:
+            return read_checkpoint(checkpoint_file, cfg, restore_random_state)
+
+    header, pickled_cfg = read_header(file)
+    if cfg is None:
+        cfg = pickle.loads(pickled_cfg)
+    length = header['classifier_length']
+    if cfg.classifier_length != length:
+        raise ValueError("Classifiers of length {} cannot be used with a configuration of length {}".format(
+            length, cfg.classifier_length))
+    arrays = read_arrays(file, header)
+    # Millions of objects are created, none of them being garbage: the
+    # collector would only go through them again and again
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        classifiers, pai_states_memory = _build_classifiers(header, arrays, cfg)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    if restore_random_state:
+        python_version, python_gauss = header['python_random']
+        random.setstate((python_version, tuple(arrays['python_random_state'].tolist()), python_gauss))
+        numpy_name, numpy_pos, numpy_has_gauss, numpy_gauss = header['numpy_random']
+        np.random.set_state((numpy_name, arrays['numpy_random_state'], numpy_pos, numpy_has_gauss, numpy_gauss))
+
+    return Checkpoint(cfg, classifiers, pai_states_memory, Counter(header['lifecycle']))
@@ -5,11 +5,15 @@
 """
 
 import random
-from typing import Callable, Dict
+from collections import Counter
+from typing import Callable
 
 import numpy as np
 
 from beacs import Perception
+from beacs.agents.beacs.ClassifierColumns import assign, gather
+from beacs.agents.beacs.components.lifecycle import count_event
+from beacs.agents.beacs.components.sampling import cumulative_weights, numerosity_index, random_below, weighted_index
 from beacs.agents.beacs.components.subsumption import find_subsumers
 
 
@@ -42,8 +46,14 @@ def should_apply(
     if action_set is None or not action_set:
         return False
 
-    overall_time = sum(cl.tga * cl.num for cl in action_set)
-    overall_num = sum(cl.num for cl in action_set)
+    columns = gather(action_set, 'tga', 'num')
+    if columns is not None:
+        tga, num = columns
+        overall_time = int((tga * num).sum())
+        overall_num = int(num.sum())
+    else:
+        overall_time = sum(cl.tga * cl.num for cl in action_set)
+        overall_num = sum(cl.num for cl in action_set)
 
     if overall_num == 0:
         return False
@@ -71,6 +81,8 @@ def set_timestamps(
     epoch: int
         Current epoch
     """
+    if assign(action_set, 'tga', epoch):
+        return
     for cl in action_set:
         cl.tga = epoch
 
@@ -95,18 +107,18 @@ def roulette_wheel_selection(
     tuple
         Two classifiers selected as parents
     """
-    def _weighted_random_choice(choices: Dict):
-        max = sum(choices.values())
-        pick = random.uniform(0, max)
-        current = 0
-        for key, value in choices.items():
-            current += value
-            if current > pick:
-                return key
-
-    choices = {cl: fitnessfunc(cl) for cl in population}
-    parent1 = _weighted_random_choice(choices)
-    parent2 = _weighted_random_choice(choices)
+    classifiers = list(population)
+    keys = {(cl.action, cl.behavioral_sequence, tuple(cl.condition)) for cl in classifiers}
+    if len(keys) != len(classifiers):
+        # Equal classifiers are drawn as a single one, the first of them
+        # with the fitness of the last of them, as keys of a dict would be
+        choices = {cl: fitnessfunc(cl) for cl in classifiers}
+        classifiers, fitness = list(choices.keys()), list(choices.values())
+    else:
+        fitness = [fitnessfunc(cl) for cl in classifiers]
+    cumulative = cumulative_weights(fitness)
+    parent1 = classifiers[weighted_index(cumulative)]
+    parent2 = classifiers[weighted_index(cumulative)]
     return parent1, parent2
 
 
@@ -178,9 +190,8 @@ def two_point_crossover(
     chromosome2 = donor.condition[left:right]
 
     # Flip them
-    for idx, el in enumerate(range(left, right)):
-        parent.condition[el] = chromosome2[idx]
-        donor.condition[el] = chromosome1[idx]
+    parent.condition[left:right] = chromosome2
+    donor.condition[left:right] = chromosome1
 
 
 def delete_classifiers(
@@ -188,7 +199,8 @@ def delete_classifiers(
         match_set,
         action_set,
         insize: int, 
-        theta_as: int
+        theta_as: int,
+        lifecycle: Counter = None
     ) -> None:
     """
     Makes room for new classifiers
@@ -206,16 +218,24 @@ def delete_classifiers(
     theta_as: int
         The action set size threshold (θas ∈ N) specifies
         the maximal number of classifiers in an action set.
+    lifecycle: Counter
+        Counts of the events of the life of the classifiers, if any
     """
     while (insize + sum(cl.num for cl in action_set)) > theta_as:
         
         # We must delete at least one
-        set_to_iterate = [cl for cl in action_set.expand()]
-        cl_del = random.choice(set_to_iterate)
-        for cl in set_to_iterate:
-            if random.random() < .3:
-                if _is_preferred_to_delete(cl_del, cl):
-                    cl_del = cl
+        # Micro-classifiers are drawn as if the action set was expanded
+        classifiers = [cl for cl in action_set if cl.num > 0]
+        cumulative = cumulative_weights([cl.num for cl in classifiers])
+        cl_del = classifiers[numerosity_index(cumulative)]
+        coins = random_below(cumulative[-1], .3)
+        # Comparing a classifier with itself never prefers it, a classifier is
+        # compared once if any of its micro-classifiers gets a coin
+        starts = np.array(cumulative, dtype=np.intp) - np.array([cl.num for cl in classifiers], dtype=np.intp)
+        selected = np.logical_or.reduceat(coins, starts)
+        for cl, is_selected in zip(classifiers, selected.tolist()):
+            if is_selected and _is_preferred_to_delete(cl_del, cl):
+                cl_del = cl
 
         if cl_del.num > 1:
             cl_del.num -= 1
@@ -225,6 +245,7 @@ def delete_classifiers(
             lists = [x for x in [population, match_set, action_set] if x]
             for lst in lists:
                 lst.safe_remove(cl_del)
+            count_event(lifecycle, 'removed_ga')
 
 
 def _is_preferred_to_delete(
@@ -266,7 +287,7 @@ def add_classifier(
         population, 
         match_set, 
         action_set
-    )-> None:
+    )-> bool:
     """
     Finds subsumer/similar classifier, if present - increase its numerosity,
     else add this new classifier
@@ -283,6 +304,11 @@ def add_classifier(
         Match set
     action_set:
         Action set
+
+    Returns
+    -------
+    bool
+        True if the new classifier was added
     """
     # Find_subsumers computes subsumer or classifier that are equal
     subsumers = find_subsumers(cl, action_set)
@@ -297,7 +323,9 @@ def add_classifier(
             action_set.append(cl)
             if match_set is not None and cl.does_match(p):
                 match_set.append(cl)
+            return True
     else:
         old_cl = subsumers[0]
         if not old_cl.is_marked():
-            old_cl.num += 1
\ No newline at end of file
+            old_cl.num += 1
+    return False
\ No newline at end of file
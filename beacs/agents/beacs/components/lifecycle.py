@@ -0,0 +1,83 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+from collections import Counter
+from typing import Optional
+
+# Origins of the classifiers
+ORIGINS = ('cover', 'expected_case', 'unexpected_case', 'ga', 'pep', 'behavioral')
+
+# Events of the life of the classifiers: a created classifier is either
+# inserted in the population or absorbed by a subsuming or equal one
+EVENTS = tuple(
+    '{}_{}'.format(event, origin) for origin in ORIGINS for event in ('created', 'absorbed')
+) + ('removed_inadequate', 'removed_ga', 'removed_pai')
+
+
+def count_event(
+        lifecycle: Optional[Counter],
+        event: str,
+        n: int = 1
+    ) -> None:
+    """
+    Counts an event of the life of the classifiers.
+
+    Parameters
+    ----------
+    lifecycle: Optional[Counter]
+        Counts of the events, nothing is counted if None
+    event: str
+        Event, taken from EVENTS
+    n: int
+        Number of times the event occurred
+    """
+    if lifecycle is not None:
+        lifecycle[event] += n
+
+
+def count_creation(
+        lifecycle: Optional[Counter],
+        origin: str,
+        inserted: bool
+    ) -> None:
+    """
+    Counts a classifier created by a mechanism and whether it was inserted.
+
+    Parameters
+    ----------
+    lifecycle: Optional[Counter]
+        Counts of the events, nothing is counted if None
+    origin: str
+        Mechanism having created the classifier, taken from ORIGINS
+    inserted: bool
+        False if the classifier was absorbed by a subsuming or equal one
+    """
+    if lifecycle is not None:
+        lifecycle['created_' + origin] += 1
+        if not inserted:
+            lifecycle['absorbed_' + origin] += 1
+
+
+def window(
+        lifecycle: Counter,
+        previous: Counter
+    ) -> dict:
+    """
+    Gives the counts of every event since a previous state of the counts.
+
+    Parameters
+    ----------
+    lifecycle: Counter
+        Counts of the events
+    previous: Counter
+        Counts of the events at the start of the window
+
+    Returns
+    -------
+    dict
+        Count of every event in the window, 0 for the events not met
+    """
+    return {event: lifecycle[event] - previous[event] for event in EVENTS}
@@ -7,6 +7,15 @@
 
 import random
 
+import numpy as np
+
+from beacs.agents.beacs.ClassifierColumns import slots_of
+from beacs.agents.beacs.components.sampling import random_below
+
+# Smallest action set of ClassifierColumns views whose double Q-learning
+# update is vectorized, the loop being faster below
+VECTORIZED_RL_MIN_SIZE = 16
+
 
 def update_classifier_q_learning(
         cl, 
@@ -72,3 +81,57 @@ def update_classifier_double_q_learning(
         cl.err += beta_rl * (abs(step_reward + gamma * max_fitness_ra - cl.rb) - cl.err)
         cl.rb += beta_rl * (step_reward + gamma * max_fitness_ra - cl.rb)
     cl.ir += beta_rl * (step_reward - cl.ir)
+
+
+def update_classifiers_double_q_learning(
+        classifiers,
+        step_reward: int,
+        max_fitness_ra: float,
+        max_fitness_rb: float,
+        beta_rl: float,
+        gamma: float
+    ) -> None:
+    """
+    Applies adapted Double Q-Learning to a whole action set, with the result
+    of calling `update_classifier_double_q_learning` on each classifier.
+    The update is vectorized, the coins being drawn at once in the order of
+    the set, when the classifiers are views on the same ClassifierColumns
+    and at least VECTORIZED_RL_MIN_SIZE of them.
+
+    Parameters
+    ----------
+    classifiers:
+        Action set
+    step_reward: int
+        Current reward obtained from the environment after executing step
+    max_fitness_ra: float
+        Maximum fitness from the action set and from the Q_a function
+    max_fitness_rb: float
+        Maximum fitness from the action set and from the Q_b function
+    beta_rl: float
+        Learning rate of RL
+    gamma: float
+        Reinforcement rate
+    """
+    target_a = step_reward + gamma * max_fitness_rb
+    target_b = step_reward + gamma * max_fitness_ra
+    located = slots_of(classifiers) if len(classifiers) >= VECTORIZED_RL_MIN_SIZE else None
+    if located is None or len(np.unique(located[1])) != len(classifiers):
+        _random = random.random
+        for cl in classifiers:
+            if _random() < 0.5:
+                cl.err += beta_rl * (abs(target_a - cl.ra) - cl.err)
+                cl.ra += beta_rl * (target_a - cl.ra)
+            else:
+                cl.err += beta_rl * (abs(target_b - cl.rb) - cl.err)
+                cl.rb += beta_rl * (target_b - cl.rb)
+            cl.ir += beta_rl * (step_reward - cl.ir)
+        return
+    store, slots = located
+    coins = random_below(len(classifiers), 0.5)
+    err, ra, rb, ir = store.err[slots], store.ra[slots], store.rb[slots], store.ir[slots]
+    error = np.where(coins, np.abs(target_a - ra), np.abs(target_b - rb))
+    store.err[slots] = err + beta_rl * (error - err)
+    store.ra[slots] = np.where(coins, ra + beta_rl * (target_a - ra), ra)
+    store.rb[slots] = np.where(coins, rb, rb + beta_rl * (target_b - rb))
+    store.ir[slots] = ir + beta_rl * (step_reward - ir)
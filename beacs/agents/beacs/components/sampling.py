@@ -0,0 +1,99 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Sequence
+
+import numpy as np
+
+
+def random_below(
+        n: int,
+        probability: float
+    ) -> np.ndarray:
+    """
+    Draws the outcomes of `random.random() < probability` for n successive
+    calls.
+
+    random.random() builds its value from two 32-bit outputs of the Mersenne
+    Twister, the top 27 bits of the first one and the top 26 bits of the
+    second one giving a 53-bit integer. getrandbits(64 * n) consumes the same
+    2 * n outputs in the same order, least significant word first, leaving
+    the generator in the same state.
+
+    Parameters
+    ----------
+    n: int
+        Number of draws
+    probability: float
+        Probability of each outcome to be True
+
+    Returns
+    -------
+    np.ndarray
+        Outcomes of the draws
+    """
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    words = np.frombuffer(random.getrandbits(64 * n).to_bytes(8 * n, 'little'), dtype='<u4').astype(np.uint64)
+    values = (words[0::2] >> 5) * 67108864 + (words[1::2] >> 6)
+    return values < probability * 9007199254740992.0
+
+
+def cumulative_weights(weights: Sequence[float]) -> List[float]:
+    """
+    Computes the running sums of weights, added in order.
+
+    Parameters
+    ----------
+    weights: Sequence[float]
+        Weights
+
+    Returns
+    -------
+    List[float]
+        Running sums, the last one being the total weight
+    """
+    return list(accumulate(weights))
+
+
+def weighted_index(cumulative: List[float]) -> int:
+    """
+    Draws an index with a probability proportional to its weight, as a scan
+    stopping where the running sum exceeds `random.uniform(0, total)` does.
+
+    Parameters
+    ----------
+    cumulative: List[float]
+        Running sums of the weights
+
+    Returns
+    -------
+    int
+        Drawn index
+    """
+    pick = random.uniform(0, cumulative[-1])
+    return min(bisect_right(cumulative, pick), len(cumulative) - 1)
+
+
+def numerosity_index(cumulative: List[int]) -> int:
+    """
+    Draws an index with a probability proportional to its integer weight,
+    as `random.choice` does on a list repeating each index its weight times.
+
+    Parameters
+    ----------
+    cumulative: List[int]
+        Running sums of the weights
+
+    Returns
+    -------
+    int
+        Drawn index
+    """
+    return bisect_right(cumulative, random.randrange(cumulative[-1]))
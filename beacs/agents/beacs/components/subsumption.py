@@ -4,7 +4,10 @@
     file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
-from typing import List
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, product
+from typing import Iterator, List, Optional, Set
 
 
 def find_subsumers(
@@ -52,12 +55,126 @@ def does_subsume(
     bool
         True if `other_cl` classifier is subsumed
     """
-    if cl.is_hard_subsumer_criteria_satisfied(other_cl) and \
-        cl.is_more_general(other_cl) and \
-            cl.does_match(other_cl.condition) and \
-                cl.action == other_cl.action and \
-                    cl.behavioral_sequence == other_cl.behavioral_sequence and \
+    if cl.action == other_cl.action and \
+        cl.behavioral_sequence == other_cl.behavioral_sequence and \
+            cl.is_hard_subsumer_criteria_satisfied(other_cl) and \
+                cl.is_more_general(other_cl) and \
+                    cl.does_match(other_cl.condition) and \
                         cl.effect.subsumes(other_cl.effect):
         return True
 
     return False
+
+
+def _generalizations(
+        condition: tuple,
+        specific_positions: List[int],
+        wildcard
+    ) -> Iterator[tuple]:
+    """
+    Yields the conditions subsuming `condition`, including itself: those
+    having a wildcard in place of any of its specific attributes.
+    """
+    for generalized in product((False, True), repeat=len(specific_positions)):
+        generalization = list(condition)
+        for position, to_generalize in zip(specific_positions, generalized):
+            if to_generalize:
+                generalization[position] = wildcard
+        yield tuple(generalization)
+
+
+def find_subsumed_in_group(
+        group: List
+    ) -> List[int]:
+    """
+    Looks for the classifiers of `group` subsumed by another classifier of
+    `group`, as Classifier.subsumes tells. All classifiers of the group are
+    expected to have the same action and behavioral sequence.
+
+    Only the classifiers whose condition subsumes the one of a classifier are
+    tried: they are found among the generalizations of its condition when
+    there are fewer generalizations than classifiers in the group, among the
+    classifiers that are not more specific otherwise.
+
+    Parameters
+    ----------
+    group:
+        Classifiers sharing an action and a behavioral sequence
+
+    Returns
+    -------
+    List[int]
+        Positions in `group` of the subsumed classifiers
+    """
+    conditions = [tuple(cl.condition) for cl in group]
+    specific_positions = [
+        [position for position, attribute in enumerate(condition) if attribute != cl.condition.wildcard]
+        for cl, condition in zip(group, conditions)
+    ]
+    by_condition = {}
+    for idx, condition in enumerate(conditions):
+        by_condition.setdefault(condition, []).append(idx)
+    by_specificity = sorted(range(len(group)), key=lambda idx: len(specific_positions[idx]))
+    specificities = [len(specific_positions[idx]) for idx in by_specificity]
+
+    subsumed = []
+    for idx, cl in enumerate(group):
+        specificity = len(specific_positions[idx])
+        if 2 ** specificity <= len(group):
+            candidates = chain.from_iterable(
+                by_condition.get(generalization, ())
+                for generalization in _generalizations(conditions[idx], specific_positions[idx], cl.condition.wildcard)
+            )
+        else:
+            candidates = by_specificity[:bisect_right(specificities, specificity)]
+        if any(group[other] != cl and group[other].subsumes(cl) for other in candidates):
+            subsumed.append(idx)
+    return subsumed
+
+
+def find_subsumed(
+        population,
+        processes: Optional[int] = None,
+        min_pooled_group_size: int = 500
+    ) -> Set[int]:
+    """
+    Looks for the classifiers of `population` subsumed by another classifier
+    of `population`, as Classifier.subsumes tells. Classifiers are grouped
+    by action and behavioral sequence, subsumption being only checked inside
+    a group.
+
+    Parameters
+    ----------
+    population:
+        Population of classifiers
+    processes: Optional[int]
+        Number of processes to check the large groups with, the groups are
+        all checked in this process if None. Classifiers, and so their
+        configuration, have then to be picklable.
+    min_pooled_group_size: int
+        Size from which a group is checked by the process pool
+
+    Returns
+    -------
+    Set[int]
+        Positions in `population` of the subsumed classifiers
+    """
+    groups = {}
+    for idx, cl in enumerate(population):
+        groups.setdefault((cl.action, cl.behavioral_sequence), []).append(idx)
+
+    pooled = []
+    if processes is not None:
+        pooled = [indices for indices in groups.values() if len(indices) >= min_pooled_group_size]
+
+    subsumed = set()
+    if pooled:
+        with ProcessPoolExecutor(processes) as executor:
+            results = executor.map(find_subsumed_in_group, [[population[idx] for idx in indices] for indices in pooled])
+            for indices, positions in zip(pooled, results):
+                subsumed.update(indices[position] for position in positions)
+    for indices in groups.values():
+        if processes is None or len(indices) < min_pooled_group_size:
+            positions = find_subsumed_in_group([population[idx] for idx in indices])
+            subsumed.update(indices[position] for position in positions)
+    return subsumed
@@ -0,0 +1,68 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+# Compares the per-classifier double Q-learning update with the batched one
+# on the same backend, plain classifiers and an ArrayClassifiersList, from
+# the sizes of action set met in the mazes to large ones:
+#   python -m example.benchmark.double_q_learning
+
+import random
+import timeit
+
+from beacs.agents.beacs import ArrayClassifiersList, Classifier, ClassifiersList, Configuration
+import beacs.agents.beacs.components.reinforcement_learning as rl
+
+BACKENDS = [ClassifiersList, ArrayClassifiersList]
+
+SIZES = [1, 3, 7, 10, 17, 20, 50, 100, 200, 500, 1000, 2000]
+STEP_REWARD, MAX_FITNESS_RA, MAX_FITNESS_RB, BETA_RL, GAMMA = 10, 0.6, 0.4, 0.05, 0.95
+
+
+def _action_set(size, population_class):
+    cfg = Configuration(classifier_length=8, number_of_possible_actions=8)
+    rng = random.Random(size)
+    return population_class(*[
+        Classifier(action=0, cfg=cfg, rewarda=rng.random(), rewardb=rng.random())
+        for _ in range(size)
+    ])
+
+
+def _per_classifier(action_set):
+    for cl in action_set:
+        rl.update_classifier_double_q_learning(cl, STEP_REWARD, MAX_FITNESS_RA, MAX_FITNESS_RB, BETA_RL, GAMMA)
+
+
+def _batched(action_set):
+    rl.update_classifiers_double_q_learning(action_set, STEP_REWARD, MAX_FITNESS_RA, MAX_FITNESS_RB, BETA_RL, GAMMA)
+
+
+def _same_results(size):
+    results = []
+    for population_class in BACKENDS:
+        for update in (_per_classifier, _batched):
+            action_set = _action_set(size, population_class)
+            random.seed(0)
+            for _ in range(10):
+                update(action_set)
+            results.append([(cl.err, cl.ra, cl.rb, cl.ir) for cl in action_set])
+    return all(result == results[0] for result in results)
+
+
+def _time(size, population_class, update, number):
+    action_set = _action_set(size, population_class)
+    return min(timeit.repeat(lambda: update(action_set), number=number, repeat=5)) / number
+
+
+if __name__ == '__main__':
+    print("{:>22} {:>6} {:>14} {:>14} {:>9} {:>6}".format(
+        'backend', 'size', 'scalar (us)', 'batched (us)', 'speedup', 'same'))
+    for population_class in BACKENDS:
+        for size in SIZES:
+            number = max(1, 20000 // size)
+            scalar = _time(size, population_class, _per_classifier, number)
+            batched = _time(size, population_class, _batched, number)
+            print("{:>22} {:>6} {:>14.1f} {:>14.1f} {:>8.2f}x {:>6}".format(population_class.__name__,
+                size, scalar * 1e6, batched * 1e6, scalar / batched, str(_same_results(size))))
@@ -0,0 +1,290 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+# Times the hot paths of the classifiers and of the population on seeded
+# synthetic populations, for several population sizes and classifier
+# lengths, from 100 to 100k classifiers of 8 to 256 attributes by default.
+# The whole sweep takes hours: a population of 100k classifiers of 256
+# attributes alone needs about 6 GB, mostly for the marks, and --sizes and
+# --lengths restrict it. Results can be written in a JSON file and compared
+# with the ones of another commit:
+#   python -m example.benchmark.hot_paths --sizes 100 1000 --lengths 8 32 \
+#       --output before.json
+#   python -m example.benchmark.hot_paths --sizes 100 1000 --lengths 8 32 \
+#       --compare before.json
+
+import argparse
+import io
+import json
+import platform
+import random
+import subprocess
+import time
+
+import numpy as np
+
+import beacs.agents.beacs as beacs_agents
+from beacs.agents.beacs import BEACS, Classifier, Configuration
+from beacs.agents.beacs.components.action_selection import choose_classifier
+from beacs.agents.beacs.components.checkpoint import read_checkpoint, write_checkpoint
+
+SIZES = [100, 1000, 10000, 100000]
+LENGTHS = [8, 32, 256]
+SYMBOLS = ['0', '1', '9']
+ACTIONS = 8
+# Classifiers handled by the benchmarks of a single classifier
+SAMPLE = 1000
+# Calls of the benchmarks of the whole population
+STEPS = 20
+
+
+def _specified(rng, length, expected):
+    # Keeps the specificity of the classifiers, and so the size of the
+    # match sets, about the same whatever the length
+    probability = min(0.5, expected / length)
+    return [rng.random() < probability for _ in range(length)]
+
+
+def _population(size, length, seed, population_class):
+    rng = random.Random(seed)
+    cfg = Configuration(classifier_length=length, number_of_possible_actions=ACTIONS,
+        population_class=population_class)
+    classifiers = []
+    for _ in range(size):
+        condition = [rng.choice(SYMBOLS) if specified else '#' for specified in _specified(rng, length, 4)]
+        effect = [rng.choice(SYMBOLS) if specified else '#' for specified in _specified(rng, length, 2)]
+        classifiers.append(Classifier(
+            condition=''.join(condition),
+            action=rng.randrange(ACTIONS),
+            effect=''.join(effect),
+            quality=rng.random(),
+            rewarda=rng.random() * 1000,
+            rewardb=rng.random() * 1000,
+            numerosity=rng.randint(1, 3),
+            experience=rng.randint(1, 100),
+            tga=rng.randint(0, 100),
+            talp=rng.randint(0, 100),
+            cfg=cfg
+        ))
+    return cfg, population_class(*classifiers)
+
+
+def _copies(size, length, seed, population_class):
+    # Builds the population of a size and a length once, the repetitions
+    # getting copies of it read back from a checkpoint. Only the checkpoint
+    # is kept, a single population being in memory at once
+    cfg, population = _population(size, length, seed, population_class)
+    situations = _situations(population, length, seed)
+    checkpoint = io.BytesIO()
+    write_checkpoint(checkpoint, cfg, population, [])
+    del population
+
+    def copy():
+        checkpoint.seek(0)
+        return population_class(*read_checkpoint(checkpoint, cfg, False).classifiers)
+    return cfg, situations, copy
+
+
+def _situations(population, length, seed):
+    # Transitions (p0, p1) starting from situations matched by some classifiers
+    rng = random.Random(seed + 1)
+    situations = []
+    for _ in range(STEPS):
+        condition = rng.choice(population).condition
+        p0 = tuple(attribute if attribute != '#' else rng.choice(SYMBOLS) for attribute in condition)
+        changed = rng.sample(range(length), 2)
+        p1 = tuple(rng.choice(SYMBOLS) if idx in changed else attribute for idx, attribute in enumerate(p0))
+        situations.append((p0, p1))
+    return situations
+
+
+def _timed(fcn, *args):
+    start = time.perf_counter()
+    fcn(*args)
+    return time.perf_counter() - start
+
+
+def _does_match(cfg, population, situations):
+    sample = population[:SAMPLE]
+    p0, _ = situations[0]
+    return _timed(lambda: [cl.condition.does_match(p0) for cl in sample]), len(sample)
+
+
+def _subsumes(cfg, population, situations):
+    sample = population[:SAMPLE + 1]
+    pairs = list(zip(sample, sample[1:]))
+    return _timed(lambda: [cl.condition.subsumes(other.condition) for cl, other in pairs]), len(pairs)
+
+
+def _does_anticipate_correctly(cfg, population, situations):
+    sample = population[:SAMPLE]
+    p0, p1 = situations[0]
+    return _timed(lambda: [cl.effect.does_anticipate_correctly(p0, p1, False) for cl in sample]), len(sample)
+
+
+def _copy_from(cfg, population, situations):
+    sample = population[:SAMPLE]
+    return _timed(lambda: [Classifier.copy_from(cl, 0) for cl in sample]), len(sample)
+
+
+def _specialize(cfg, population, situations):
+    copies = [Classifier.copy_from(cl, 0) for cl in population[:SAMPLE]]
+    p0, p1 = situations[0]
+    return _timed(lambda: [cl.specialize(p0, p1) for cl in copies]), len(copies)
+
+
+def _form_match_set(cfg, population, situations):
+    return _timed(lambda: [population.form_match_set(p0) for p0, _ in situations]), len(situations)
+
+
+def _form_action_set(cfg, population, situations):
+    match_sets = [population.form_match_set(p0)[0] for p0, _ in situations]
+    calls = [(match_set, cl) for match_set in match_sets for cl in list(match_set)[:ACTIONS]]
+    return _timed(lambda: [match_set.form_action_set(cl) for match_set, cl in calls]), len(calls)
+
+
+def _choose_classifier(cfg, population, situations):
+    match_sets = [population.form_match_set(p0)[0] for p0, _ in situations]
+    random.seed(0)
+    return _timed(lambda: [choose_classifier(match_set, cfg, 0.5) for match_set in match_sets]), len(match_sets)
+
+
+def _apply_alp(cfg, population, situations):
+    elapsed = 0.
+    random.seed(0)
+    for time_step, (p0, p1) in enumerate(situations):
+        match_set = population.form_match_set(p0)[0]
+        action_classifier = choose_classifier(match_set, cfg, 0.5)
+        action_set = match_set.form_action_set(action_classifier)
+        elapsed += _timed(beacs_agents.ClassifiersList.apply_alp, population, None, None, match_set,
+            action_set, None, p0, action_classifier.action, p1, 1000 + time_step, [], cfg)
+    return elapsed, len(situations)
+
+
+def _apply_ga(cfg, population, situations):
+    elapsed = 0.
+    random.seed(0)
+    for time_step, (p0, p1) in enumerate(situations):
+        match_set = population.form_match_set(p0)[0]
+        action_classifier = choose_classifier(match_set, cfg, 0.5)
+        action_set = match_set.form_action_set(action_classifier)
+        # Late enough for the GA to apply on every action set
+        elapsed += _timed(beacs_agents.ClassifiersList.apply_ga, 100000 + time_step * cfg.theta_ga,
+            population, match_set, action_set, p0, p1, cfg.theta_ga, cfg.mu, cfg.chi, cfg.theta_as)
+    return elapsed, len(situations)
+
+
+def _zip_population(cfg, population, situations):
+    agent = BEACS(cfg, population)
+    return _timed(agent.zip_population), 1
+
+
+def _save_checkpoint(cfg, population, situations):
+    return _timed(write_checkpoint, io.BytesIO(), cfg, population, []), 1
+
+
+def _load_checkpoint(cfg, population, situations):
+    checkpoint = io.BytesIO()
+    write_checkpoint(checkpoint, cfg, population, [])
+    checkpoint.seek(0)
+    return _timed(read_checkpoint, checkpoint, cfg, False), 1
+
+
+BENCHMARKS = {
+    'condition_does_match': _does_match,
+    'condition_subsumes': _subsumes,
+    'effect_does_anticipate_correctly': _does_anticipate_correctly,
+    'classifier_copy_from': _copy_from,
+    'classifier_specialize': _specialize,
+    'form_match_set': _form_match_set,
+    'form_action_set': _form_action_set,
+    'choose_classifier': _choose_classifier,
+    'apply_alp': _apply_alp,
+    'apply_ga': _apply_ga,
+    'zip_population': _zip_population,
+    'save_checkpoint': _save_checkpoint,
+    'load_checkpoint': _load_checkpoint,
+}
+
+
+def run(sizes, lengths, benchmarks, repeat, seed, population_class):
+    """
+    Times the benchmarks, each one on a fresh copy of the population for
+    every repetition, the population being built once per size and length.
+
+    Returns
+    -------
+    list
+        One result per benchmark, size and length, the time per call being
+        the lowest of the repetitions
+    """
+    results = []
+    for length in lengths:
+        for size in sizes:
+            cfg, situations, copy = _copies(size, length, seed, population_class)
+            for name in benchmarks:
+                best = None
+                for _ in range(repeat):
+                    population = copy()
+                    np.random.seed(seed)
+                    elapsed, calls = BENCHMARKS[name](cfg, population, situations)
+                    del population
+                    per_call = elapsed / calls if calls else 0.
+                    best = per_call if best is None else min(best, per_call)
+                results.append({'benchmark': name, 'size': size, 'length': length, 'seconds_per_call': best})
+                print("{:>34} {:>8} {:>6} {:>14.2f}".format(name, size, length, best * 1e6), flush=True)
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(results, previous):
+    before = {(r['benchmark'], r['size'], r['length']): r['seconds_per_call'] for r in previous['results']}
+    print("\nCompared with {}".format(previous.get('commit')))
+    print("{:>34} {:>8} {:>6} {:>14} {:>14} {:>8}".format('benchmark', 'size', 'length', 'before (us)', 'after (us)', 'ratio'))
+    for result in results:
+        key = (result['benchmark'], result['size'], result['length'])
+        if key in before and before[key] > 0:
+            print("{:>34} {:>8} {:>6} {:>14.2f} {:>14.2f} {:>8.2f}".format(*key,
+                before[key] * 1e6, result['seconds_per_call'] * 1e6, result['seconds_per_call'] / before[key]))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Times the hot paths of BEACS on synthetic populations")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="population sizes")
+    parser.add_argument('--lengths', type=int, nargs='+', default=LENGTHS, help="classifier lengths")
+    parser.add_argument('--benchmarks', nargs='+', default=list(BENCHMARKS), choices=list(BENCHMARKS),
+        help="benchmarks to run, all of them by default")
+    parser.add_argument('--population-class', default='ClassifiersList',
+        choices=['ClassifiersList', 'IndexedClassifiersList', 'ArrayClassifiersList'])
+    parser.add_argument('--repeat', type=int, default=3, help="repetitions, the best one being kept")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON file to write the results in")
+    parser.add_argument('--compare', help="JSON file of previous results to compare with")
+    args = parser.parse_args()
+
+    print("{:>34} {:>8} {:>6} {:>14}".format('benchmark', 'size', 'length', 'us per call'))
+    results = run(args.sizes, args.lengths, args.benchmarks, args.repeat, args.seed,
+        getattr(beacs_agents, args.population_class))
+    report = {
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'population_class': args.population_class,
+        'seed': args.seed,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as previous:
+            _compare(results, json.load(previous))
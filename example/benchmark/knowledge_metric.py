@@ -0,0 +1,68 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+# Compares the knowledge metric computed classifier by classifier with the
+# vectorized one, on the classifiers learnt in Woods102, Maze10 and MazeE1 by several
+# runs put together:
+#   python -m example.benchmark.knowledge_metric [trials] [runs]
+
+import random
+import sys
+import timeit
+
+import gym
+import my_mazes
+import numpy as np
+
+from beacs.agents.beacs import BEACS, Configuration
+from example.metrics.MazeMetrics import covered_transitions
+
+MAZES = ['Woods102-v0', 'Maze10-v0', 'MazeE1-v0']
+TRIALS = 300
+RUNS = 5
+
+
+def _population(maze_id, trials, runs):
+    maze = gym.make(maze_id)
+    population = []
+    for seed in range(runs):
+        random.seed(seed)
+        np.random.seed(seed)
+        cfg = Configuration(classifier_length=8, number_of_possible_actions=8,
+            do_pep=True, epsilon=0.8, u_max=8, bs_max=2, theta_bseq=100)
+        run_population, _ = BEACS(cfg).explore(maze, trials)
+        population.extend(run_population)
+    return maze, population
+
+
+def _transitions(maze):
+    return {
+        (maze.env.maze.perception(*start), action, maze.env.maze.perception(*end))
+        for start, action, end in maze.env.get_all_possible_transitions()
+    }
+
+
+def _per_classifier(classifiers, transitions):
+    return sum(1 for p0, action, p1 in transitions
+        if any(cl.does_predict_successfully(p0, action, p1) for cl in classifiers))
+
+
+if __name__ == '__main__':
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else TRIALS
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else RUNS
+    print("{:>12} {:>12} {:>12} {:>12} {:>16} {:>9} {:>6}".format(
+        'maze', 'classifiers', 'reliable', 'transitions', 'per cl. (ms)', 'vect. (ms)', 'same'))
+    for maze_id in MAZES:
+        maze, population = _population(maze_id, trials, runs)
+        transitions = _transitions(maze)
+        # Every classifier, reliable or not, to get a larger population
+        for name, classifiers in [('all', list(population)),
+            ('reliable', [cl for cl in population if cl.is_reliable() and cl.behavioral_sequence is None])]:
+            slow = min(timeit.repeat(lambda: _per_classifier(classifiers, transitions), number=1, repeat=3))
+            fast = min(timeit.repeat(lambda: covered_transitions(classifiers, transitions), number=1, repeat=3))
+            same = _per_classifier(classifiers, transitions) == covered_transitions(classifiers, transitions)
+            print("{:>12} {:>12} {:>12} {:>12} {:>16.1f} {:>9.1f} {:>6}".format(
+                maze_id, len(population), name, len(transitions), slow * 1e3, fast * 1e3, str(same)))
@@ -0,0 +1,86 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+# Compares the exploitation of a population saved in a checkpoint by a
+# MappedPopulation with the one of BEACS with beta_rl=0, which must go the
+# same way, for several mazes and population classes, with and without an
+# alphabet:
+#   python -m example.benchmark.mapped_exploit [explore trials] [exploit trials]
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+import gym
+import my_mazes
+import numpy as np
+
+from beacs import Alphabet
+from beacs.agents.beacs import (ArrayClassifiersList, BEACS, ClassifiersList, Configuration,
+    IndexedClassifiersList, MappedPopulation)
+
+MAZES = ['Woods101-v0', 'MazeE2-v0', 'Maze4-v0']
+POPULATION_CLASSES = [ClassifiersList, IndexedClassifiersList, ArrayClassifiersList]
+EXPLORE_TRIALS = 200
+EXPLOIT_TRIALS = 100
+SEED = 0
+
+
+def _cfg(population_class, alphabet, **kwargs):
+    return Configuration(classifier_length=8, number_of_possible_actions=8, metrics_trial_frequency=1,
+        bs_max=2, population_class=population_class, alphabet=Alphabet() if alphabet else None, **kwargs)
+
+
+def _checkpoint(maze, population_class, alphabet, trials, path):
+    random.seed(SEED)
+    np.random.seed(SEED)
+    agent = BEACS(_cfg(population_class, alphabet, do_pep=True, epsilon=0.8, u_max=8, theta_bseq=100))
+    agent.explore(maze, trials)
+    agent.save_checkpoint(path)
+    return agent.cfg.alphabet
+
+
+def _basic(metrics):
+    return [(m['trial'], m['steps_in_trial'], m['reward']) for m in metrics]
+
+
+def _compare(maze_id, population_class, alphabet, explore_trials, exploit_trials, path):
+    maze = gym.make(maze_id)
+    learnt_alphabet = _checkpoint(maze, population_class, alphabet, explore_trials, path)
+    cfg = _cfg(population_class, alphabet, beta_rl=0., epsilon=0.2)
+    cfg.alphabet = learnt_alphabet
+
+    agent = BEACS.from_checkpoint(path, cfg, restore_random_state=False)
+    random.seed(SEED)
+    start = time.perf_counter()
+    _, agent_metrics = agent.exploit(maze, exploit_trials)
+    agent_seconds = time.perf_counter() - start
+
+    mapped = MappedPopulation(path, cfg)
+    random.seed(SEED)
+    start = time.perf_counter()
+    mapped_metrics = mapped.exploit(maze, exploit_trials)
+    mapped_seconds = time.perf_counter() - start
+    return len(mapped), agent_seconds, mapped_seconds, _basic(agent_metrics) == _basic(mapped_metrics)
+
+
+if __name__ == '__main__':
+    explore_trials = int(sys.argv[1]) if len(sys.argv) > 1 else EXPLORE_TRIALS
+    exploit_trials = int(sys.argv[2]) if len(sys.argv) > 2 else EXPLOIT_TRIALS
+    print("{:>12} {:>22} {:>9} {:>12} {:>12} {:>12} {:>8} {:>6}".format(
+        'maze', 'population', 'alphabet', 'classifiers', 'BEACS (ms)', 'mapped (ms)', 'speedup', 'same'))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'population.ckpt')
+        for maze_id in MAZES:
+            for population_class in POPULATION_CLASSES:
+                for alphabet in (False, True):
+                    size, agent_seconds, mapped_seconds, same = _compare(maze_id, population_class, alphabet,
+                        explore_trials, exploit_trials, path)
+                    print("{:>12} {:>22} {:>9} {:>12} {:>12.1f} {:>12.1f} {:>7.1f}x {:>6}".format(
+                        maze_id, population_class.__name__, str(alphabet), size, agent_seconds * 1e3,
+                        mapped_seconds * 1e3, agent_seconds / mapped_seconds, str(same)), flush=True)
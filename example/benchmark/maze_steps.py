@@ -0,0 +1,51 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+# Measures the raw number of steps per second of every maze, taking random
+# actions and resetting the maze at the end of each episode, and the number
+# of resets per second:
+#   python -m example.benchmark.maze_steps [steps]
+
+import random
+import sys
+import time
+
+import gym
+import my_mazes
+
+STEPS = 20000
+
+
+def _steps_per_second(maze_id, steps, prob_slippery=0.0):
+    maze = gym.make(maze_id).env
+    maze.set_prob_slippery(prob_slippery)
+    random.seed(0)
+    maze.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, done, _ = maze.step(random.randint(0, 7))
+        if done:
+            maze.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def _resets_per_second(maze_id, resets):
+    maze = gym.make(maze_id).env
+    random.seed(0)
+    start = time.perf_counter()
+    for _ in range(resets):
+        maze.reset()
+    return resets / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    steps = int(sys.argv[1]) if len(sys.argv) > 1 else STEPS
+    maze_ids = sorted(spec.id for spec in gym.envs.registry.all() if str(spec.entry_point).startswith('my_mazes.'))
+    print("{:>16} {:>12} {:>16} {:>12}".format('maze', 'steps/s', 'slippery steps/s', 'resets/s'))
+    for maze_id in maze_ids:
+        print("{:>16} {:>12.0f} {:>16.0f} {:>12.0f}".format(
+            maze_id, _steps_per_second(maze_id, steps), _steps_per_second(maze_id, steps, 0.1),
+            _resets_per_second(maze_id, steps)))
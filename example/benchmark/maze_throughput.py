@@ -0,0 +1,183 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+# Runs BEACS on every registered maze as the benchmark notebooks do, with the
+# settings of an expe.cfg file and fixed seeds: exploration, zipping of the
+# population and the three exploitation phases. Reports the steps and trials
+# per second, the peak population size, the peak resident memory and the
+# time spent in each phase of the trials, and writes them in a compact JSON
+# file:
+#   python -m example.benchmark.maze_throughput [--mazes Woods1-v0 ...] \
+#       [--explore-trials 500] [--exploit-trials 50] [--output results.json]
+#
+# Every maze is run in a process of its own, so that its peak memory is its
+# own. The phases of the trials are timed by the phase profiler of BEACS.
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import time
+
+import gym
+import my_mazes
+import numpy as np
+
+import beacs.agents.beacs as beacs_agents
+from beacs.agents.beacs import BEACS, Configuration
+from example.experiments.runner import SETTINGS, load_settings
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def _population_size(population, environment):
+    return {'population': len(population)}
+
+
+def _run(maze_id, settings, seed, explore_trials, exploit_trials, population_class):
+    random.seed(seed)
+    np.random.seed(seed)
+    maze = gym.make(maze_id)
+    maze.env.set_prob_slippery(settings['SLIPPERY_PROB'])
+    maze.env.set_random_attribute_length(settings['RANDOM_ATTRIBUTE_LENGTH'])
+    common = dict(
+        classifier_length=settings['CLASSIFIER_LENGTH'],
+        number_of_possible_actions=settings['NUMBER_OF_POSSIBLE_ACTIONS'],
+        user_metrics_collector_fcn=_population_size,
+        metrics_trial_frequency=1,
+        gamma=settings['GAMMA'],
+        population_class=getattr(beacs_agents, population_class),
+        do_phase_profiling=True
+    )
+    cfg_explore = Configuration(
+        do_pep=settings['ENABLE_PEP'],
+        beta_alp=settings['BETA_ALP'],
+        beta_rl=settings['BETA_RL'],
+        epsilon=settings['EPSILON'],
+        u_max=settings['CLASSIFIER_LENGTH'],
+        mu=settings['MUTATION'],
+        chi=settings['CROSSOVER'],
+        bs_max=settings['LENGTH_OF_BEHAVIORAL_SEQUENCES'],
+        **common
+    )
+    cfg_exploits = [
+        Configuration(beta_rl=settings['BETA_EXPLOIT_NO_RL'], epsilon=0.2, **common),
+        Configuration(beta_rl=settings['BETA_EXPLOIT_RL_START'], epsilon=0.0, **common),
+        Configuration(beta_rl=settings['BETA_EXPLOIT_RL'], epsilon=0.0, **common),
+    ]
+    if explore_trials is None:
+        explore_trials = settings['NUMBER_OF_EXPLORE_TRIALS']
+    if exploit_trials is None:
+        exploit_trials = [settings['NUMBER_OF_EXPLOIT_TRIALS_NO_RL'],
+            settings['NUMBER_OF_EXPLOIT_TRIALS_RL_START'], settings['NUMBER_OF_EXPLOIT_TRIALS_RL']]
+    else:
+        exploit_trials = [exploit_trials] * len(cfg_exploits)
+
+    start = time.perf_counter()
+    agent = BEACS(cfg_explore)
+    _, metrics = agent.explore(maze, explore_trials)
+    explore_seconds = time.perf_counter() - start
+    explore_phases = agent.get_profiler().totals
+    peak_population = max(m['population'] for m in metrics)
+
+    start = time.perf_counter()
+    agent.zip_population()
+    zip_seconds = time.perf_counter() - start
+
+    population = agent.get_population()
+    exploit_seconds, exploit_phases = 0., {}
+    for cfg_exploit, trials in zip(cfg_exploits, exploit_trials):
+        start = time.perf_counter()
+        agent = BEACS(cfg_exploit, population)
+        population, _ = agent.exploit(maze, trials)
+        exploit_seconds += time.perf_counter() - start
+        for phase, (elapsed, calls, size) in agent.get_profiler().totals.items():
+            record = exploit_phases.setdefault(phase, [0., 0, 0])
+            record[0] += elapsed
+            record[1] += calls
+            record[2] += size
+
+    explore_steps = explore_phases['env_step'][1]
+    exploit_steps = exploit_phases['env_step'][1]
+    return {
+        'maze': maze_id,
+        'explore_trials': explore_trials,
+        'explore_steps': explore_steps,
+        'explore_seconds': explore_seconds,
+        'explore_steps_per_second': explore_steps / explore_seconds,
+        'explore_trials_per_second': explore_trials / explore_seconds,
+        'zip_seconds': zip_seconds,
+        'exploit_trials': sum(exploit_trials),
+        'exploit_steps': exploit_steps,
+        'exploit_seconds': exploit_seconds,
+        'exploit_steps_per_second': exploit_steps / exploit_seconds,
+        'exploit_trials_per_second': sum(exploit_trials) / exploit_seconds,
+        'peak_population': peak_population,
+        'zipped_population': len(population),
+        # Kilobytes on Linux
+        'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource is not None else None,
+        'explore_phase_seconds': {phase: record[0] for phase, record in explore_phases.items()},
+        'exploit_phase_seconds': {phase: record[0] for phase, record in exploit_phases.items()},
+    }
+
+
+def _run_task(task):
+    return _run(*task)
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == '__main__':
+    maze_ids = sorted(spec.id for spec in gym.envs.registry.all() if str(spec.entry_point).startswith('my_mazes.'))
+    parser = argparse.ArgumentParser(description="Runs BEACS on every registered maze and measures its throughput")
+    parser.add_argument('--settings', default=SETTINGS, help="expe.cfg file")
+    parser.add_argument('--mazes', nargs='+', default=maze_ids, choices=maze_ids, help="mazes, all of them by default")
+    parser.add_argument('--explore-trials', type=int, help="exploration trials instead of the ones of the settings")
+    parser.add_argument('--exploit-trials', type=int, help="trials of every exploitation phase instead of the ones of the settings")
+    parser.add_argument('--population-class', default='ClassifiersList',
+        choices=['ClassifiersList', 'IndexedClassifiersList', 'ArrayClassifiersList'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=1, help="mazes run at the same time")
+    parser.add_argument('--output', default='maze_throughput.json', help="JSON file to write the results in")
+    args = parser.parse_args()
+
+    settings = load_settings(args.settings)
+    tasks = [(maze_id, settings, args.seed, args.explore_trials, args.exploit_trials, args.population_class)
+        for maze_id in args.mazes]
+    print("{:>16} {:>14} {:>14} {:>14} {:>14} {:>10} {:>12}".format('maze', 'explore st/s', 'explore tr/s',
+        'exploit st/s', 'exploit tr/s', 'peak pop.', 'peak RSS kB'))
+    results = []
+    # A new process for every maze
+    with multiprocessing.Pool(args.processes, maxtasksperchild=1) as pool:
+        for result in pool.imap(_run_task, tasks):
+            results.append(result)
+            print("{:>16} {:>14.0f} {:>14.2f} {:>14.0f} {:>14.2f} {:>10} {:>12}".format(result['maze'],
+                result['explore_steps_per_second'], result['explore_trials_per_second'],
+                result['exploit_steps_per_second'], result['exploit_trials_per_second'],
+                result['peak_population'], str(result['peak_rss'])), flush=True)
+
+    report = {
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'settings': os.path.basename(args.settings),
+        'population_class': args.population_class,
+        'seed': args.seed,
+        'results': results,
+    }
+    with open(args.output, 'w') as output:
+        json.dump(report, output, separators=(',', ':'), sort_keys=True)
@@ -0,0 +1,215 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from typing import Optional
+
+from beacs import Alphabet
+
+# Modules whose source code is part of the code version, the packages
+# covering all of their modules
+CODE_MODULES = ('beacs', 'my_mazes', 'example.metrics', 'example.experiments.runner')
+
+
+def describe(value):
+    """
+    Gives a JSON form of a value made of the values of its attributes, down
+    to numbers and strings, the same from one run to the other.
+
+    Functions and classes are described by their qualified names, their
+    code being part of the code version. An Alphabet is described by its
+    wildcard only, the symbols it interns while running left out.
+
+    Parameters
+    ----------
+    value
+        Value, such as a Configuration
+
+    Returns
+    -------
+    JSON form of the value
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return {field: describe(item) for field, item in zip(value._fields, value)}
+    if isinstance(value, (list, tuple)):
+        return [describe(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): describe(item) for key, item in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, type) or callable(value):
+        return '{}.{}'.format(value.__module__, value.__qualname__)
+    if isinstance(value, Alphabet):
+        return {
+            'class': '{}.{}'.format(type(value).__module__, type(value).__qualname__),
+            'wildcard': describe(value.wildcard)
+        }
+    return {
+        'class': '{}.{}'.format(type(value).__module__, type(value).__qualname__),
+        'attributes': describe(vars(value))
+    }
+
+
+def _source_files(module_name):
+    # Source files of a module as (path relative to the module, path)
+    __import__(module_name)
+    module = sys.modules[module_name]
+    paths = getattr(module, '__path__', None)
+    if paths is None:
+        return [(os.path.basename(module.__file__), module.__file__)] if getattr(module, '__file__', None) else []
+    files = []
+    for path in paths:
+        for root, dirs, names in os.walk(path):
+            dirs[:] = sorted(name for name in dirs if name != '__pycache__')
+            files.extend((os.path.relpath(os.path.join(root, name), path), os.path.join(root, name))
+                for name in sorted(names) if name.endswith('.py'))
+    return files
+
+
+def code_version(*module_names: str) -> str:
+    """
+    Gives a hash of the source code of modules, changing as soon as one of
+    their files does, whether committed or not.
+
+    Parameters
+    ----------
+    module_names: str
+        Names of the modules, CODE_MODULES if none
+
+    Returns
+    -------
+    str
+        Code version
+    """
+    digest = hashlib.sha256()
+    for module_name in module_names or CODE_MODULES:
+        for relative_path, path in _source_files(module_name):
+            digest.update(module_name.encode() + b'\0' + relative_path.encode() + b'\0')
+            with open(path, 'rb') as source:
+                digest.update(hashlib.sha256(source.read()).digest())
+    return digest.hexdigest()
+
+
+def hash_seed() -> Optional[str]:
+    """
+    Gives the PYTHONHASHSEED of the process, the hashes of strings and so
+    the order of some sets of classifiers depending on it.
+
+    Returns
+    -------
+    Optional[str]
+        Hash seed, None if the hashes are randomized
+    """
+    seed = os.environ.get('PYTHONHASHSEED')
+    return None if seed in (None, '', 'random') else seed
+
+
+def cell_key(
+        env_id: str,
+        seed: int,
+        experiment,
+        version: str
+    ) -> str:
+    """
+    Gives the key of the result of a cell: a hash of its maze, seed,
+    experiment (all the fields of its configurations included), of the code
+    version and of the hash seed. The name of the experiment is left out.
+
+    Parameters
+    ----------
+    env_id: str
+        Maze
+    seed: int
+        Seed
+    experiment
+        Experiment of the cell
+    version: str
+        Code version
+
+    Returns
+    -------
+    str
+        Key
+    """
+    description = {'env_id': env_id, 'seed': seed, 'experiment': describe(experiment), 'code_version': version,
+        'hash_seed': hash_seed()}
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Results of the cells of experiment grids stored in a directory, one JSON
+    file per result named after its key.
+
+    A result is written in a temporary file renamed once complete, so that
+    an interrupted run never leaves a partial result behind and several
+    processes can fill the same cache.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Gives a cached result.
+
+        Parameters
+        ----------
+        key: str
+            Key of the result
+
+        Returns
+        -------
+        Optional[dict]
+            Result, None if not cached
+        """
+        try:
+            with open(self._path(key)) as result_file:
+                return json.load(result_file)
+        except FileNotFoundError:
+            return None
+
+
+    def put(
+            self,
+            key: str,
+            result: dict
+        ) -> None:
+        """
+        Caches a result.
+
+        Parameters
+        ----------
+        key: str
+            Key of the result
+        result: dict
+            Result
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w') as result_file:
+                json.dump(result, result_file)
+                result_file.flush()
+                os.fsync(result_file.fileno())
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
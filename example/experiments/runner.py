@@ -0,0 +1,429 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+# Runs a grid of experiments (maze x seed x experiment) over a local pool of
+# processes, each cell exploring, exploiting without then with reinforcement
+# learning and zipping the population, and writes the result of every cell
+# as a JSON line as soon as it is done:
+#   python -m example.experiments.runner [--mazes Woods100-v0 ...] \
+#       [--iterations 30] [--processes 60] [--output results.jsonl] \
+#       [--cache runner_cache]
+#
+# The results are also cached by a hash of the maze, the seed, the
+# experiment and the source code, so that an interrupted grid takes up where
+# it stopped when run again, and changing a setting only runs the cells it
+# changes.
+#
+# run_mapped_exploit runs exploitation trials of a saved population over many
+# seeds, every process of the pool mapping the checkpoint file instead of
+# receiving its own copy of the population.
+#
+# The result of a cell only depends on its maze, seed and experiment when
+# PYTHONHASHSEED is set, the order of some sets of classifiers depending on
+# the hashes of strings: the results are only cached then, the hash seed
+# being part of their key.
+
+import argparse
+import json
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import gym
+import my_mazes
+import numpy as np
+
+from beacs.agents.beacs import BEACS, Configuration, MappedPopulation
+from example.experiments.cache import ResultCache, cell_key, code_version, hash_seed
+from example.metrics.MazeMetrics import _maze_metrics, _when_full_knowledge_is_achieved
+
+SETTINGS = os.path.join(os.path.dirname(__file__), '..', 'data', 'Thesis', 'expe.cfg')
+
+# Configurations and numbers of trials of the phases of a cell, with the
+# set up of the maze
+Experiment = namedtuple('Experiment', [
+    'cfg_explore', 'cfg_exploit_no_rl', 'cfg_exploit_rl',
+    'explore_trials', 'exploit_no_rl_trials', 'exploit_rl_trials',
+    'slippery_prob', 'random_attribute_length'
+])
+
+# A run of an experiment, by its name, on a maze with a seed
+Cell = namedtuple('Cell', ['env_id', 'seed', 'experiment'])
+
+# Experiments by name and cache of the results, set once in every process of
+# the pool
+_experiments = {}
+_cache = None
+# Population mapped once in every process of the pool of run_mapped_exploit
+_mapped_population = None
+
+
+def load_settings(path: str) -> dict:
+    """
+    Reads the settings written as `NAME = expression` at the top of an
+    expe.cfg file, an expression being able to use the settings above it.
+    The indented configuration code following them is ignored.
+
+    Parameters
+    ----------
+    path: str
+        Path of the file
+
+    Returns
+    -------
+    dict
+        Settings by name
+    """
+    settings = {}
+    with open(path) as settings_file:
+        for line in settings_file:
+            if line.startswith((' ', '\t')):
+                break
+            line = line.split('#')[0].strip()
+            if '=' in line:
+                name, expression = (part.strip() for part in line.split('=', 1))
+                settings[name] = eval(expression, {'__builtins__': {}}, dict(settings))
+    return settings
+
+
+def experiment_from_settings(
+        settings: dict,
+        **cfg_options
+    ) -> Experiment:
+    """
+    Builds the experiment of the benchmark notebooks from expe.cfg settings.
+
+    Parameters
+    ----------
+    settings: dict
+        Settings read by load_settings
+    cfg_options
+        Further options of the three configurations, such as population_class
+
+    Returns
+    -------
+    Experiment
+        Experiment
+    """
+    common = dict(
+        classifier_length=settings['CLASSIFIER_LENGTH'],
+        number_of_possible_actions=settings['NUMBER_OF_POSSIBLE_ACTIONS'],
+        user_metrics_collector_fcn=_maze_metrics,
+        gamma=settings['GAMMA'],
+        **cfg_options
+    )
+    return Experiment(
+        cfg_explore=Configuration(
+            metrics_trial_frequency=settings['METRICS_TRIAL_FREQUENCY_EXPLORE'],
+            do_pep=settings['ENABLE_PEP'],
+            beta_alp=settings['BETA_ALP'],
+            beta_rl=settings['BETA_RL'],
+            epsilon=settings['EPSILON'],
+            u_max=settings['CLASSIFIER_LENGTH'],
+            mu=settings['MUTATION'],
+            chi=settings['CROSSOVER'],
+            bs_max=settings['LENGTH_OF_BEHAVIORAL_SEQUENCES'],
+            **common
+        ),
+        cfg_exploit_no_rl=Configuration(metrics_trial_frequency=1, beta_rl=settings['BETA_EXPLOIT_NO_RL'],
+            epsilon=0.2, **common),
+        cfg_exploit_rl=Configuration(metrics_trial_frequency=1, beta_rl=settings['BETA_EXPLOIT_RL'],
+            epsilon=0.0, **common),
+        explore_trials=settings['NUMBER_OF_EXPLORE_TRIALS'],
+        exploit_no_rl_trials=settings['NUMBER_OF_EXPLOIT_TRIALS_NO_RL'],
+        exploit_rl_trials=settings['NUMBER_OF_EXPLOIT_TRIALS_RL'],
+        slippery_prob=settings['SLIPPERY_PROB'],
+        random_attribute_length=settings['RANDOM_ATTRIBUTE_LENGTH']
+    )
+
+
+def grid(
+        env_ids: Iterable[str],
+        seeds: Iterable[int],
+        experiments: Iterable[str]
+    ) -> List[Cell]:
+    """
+    Builds the cells of a grid, seed by seed so that the mazes are
+    interleaved and the long ones do not all end up at the end of the run.
+
+    Parameters
+    ----------
+    env_ids: Iterable[str]
+        Mazes
+    seeds: Iterable[int]
+        Seeds
+    experiments: Iterable[str]
+        Names of the experiments
+
+    Returns
+    -------
+    List[Cell]
+        Cells
+    """
+    env_ids, experiments = list(env_ids), list(experiments)
+    return [Cell(env_id, seed, name) for seed in seeds for name in experiments for env_id in env_ids]
+
+
+def _average_steps(metrics) -> float:
+    return sum(trial['steps_in_trial'] for trial in metrics) / len(metrics) if metrics else 0.
+
+
+def run_cell(
+        cell: Cell,
+        experiment: Experiment
+    ) -> dict:
+    """
+    Runs a cell: exploration, exploitation without then with reinforcement
+    learning, and zipping of the population.
+
+    Parameters
+    ----------
+    cell: Cell
+        Cell
+    experiment: Experiment
+        Experiment of the cell
+
+    Returns
+    -------
+    dict
+        Result of the cell
+    """
+    random.seed(cell.seed)
+    np.random.seed(cell.seed)
+    maze = gym.make(cell.env_id)
+    maze.env.set_prob_slippery(experiment.slippery_prob)
+    maze.env.set_random_attribute_length(experiment.random_attribute_length)
+    result = {'maze': cell.env_id, 'seed': cell.seed, 'experiment': cell.experiment}
+
+    start = time.perf_counter()
+    agent = BEACS(experiment.cfg_explore)
+    population, metrics_explore = agent.explore(maze, experiment.explore_trials)
+    result['explore_seconds'] = time.perf_counter() - start
+    result['explore'] = _maze_metrics(population, maze)
+    result['explore_metrics'] = metrics_explore
+    result['full_knowledge_trials'] = _when_full_knowledge_is_achieved(metrics_explore)
+    result['pai_states'] = len(agent.get_pai_states_memory())
+
+    start = time.perf_counter()
+    agent_no_rl = BEACS(experiment.cfg_exploit_no_rl, agent.duplicate_population())
+    population, metrics_no_rl = agent_no_rl.exploit(maze, experiment.exploit_no_rl_trials)
+    agent_rl = BEACS(experiment.cfg_exploit_rl, population)
+    _, metrics_rl = agent_rl.exploit(maze, experiment.exploit_rl_trials)
+    result['exploit_seconds'] = time.perf_counter() - start
+    result['exploit_no_rl_average_steps'] = _average_steps(metrics_no_rl)
+    result['exploit_rl_average_steps'] = _average_steps(metrics_rl)
+
+    start = time.perf_counter()
+    agent.zip_population()
+    result['zip_seconds'] = time.perf_counter() - start
+    result['zip'] = _maze_metrics(agent.get_population(), maze)
+    return result
+
+
+def _set_experiments(experiments: Dict[str, Experiment], cache: ResultCache) -> None:
+    global _experiments, _cache
+    _experiments, _cache = experiments, cache
+
+
+def _run_chunk(chunk: List[Tuple[Cell, str]]) -> List[dict]:
+    results = []
+    for cell, key in chunk:
+        result = run_cell(cell, _experiments[cell.experiment])
+        # Cached as soon as done, whatever happens to the rest of the chunk
+        if _cache is not None:
+            _cache.put(key, result)
+        results.append(result)
+    return results
+
+
+def run_grid(
+        cells: List[Cell],
+        experiments: Dict[str, Experiment],
+        output: str = None,
+        processes: int = None,
+        chunksize: int = 1,
+        cache: ResultCache = None
+    ) -> Iterator[dict]:
+    """
+    Runs cells over a pool of processes, yielding and writing their results
+    as they end, in the order they end.
+
+    The results found in the cache are yielded first, without being run nor
+    written again.
+
+    Cells are sent to the pool by chunks, a few chunks per process at most
+    being queued: an idle process takes the next queued chunk, whichever
+    process the chunks before it went to, so that long cells do not hold up
+    the others.
+
+    Parameters
+    ----------
+    cells: List[Cell]
+        Cells
+    experiments: Dict[str, Experiment]
+        Experiments of the cells by name, sent once to every process
+    output: str
+        JSON lines file the results are appended to, if any
+    processes: int
+        Number of processes, the number of CPUs if None
+    chunksize: int
+        Number of cells sent to a process at once
+    cache: ResultCache
+        Cache of the results, if any. It requires PYTHONHASHSEED to be set,
+        the results not being reproducible otherwise
+
+    Returns
+    -------
+    Iterator[dict]
+        Results of the cells
+    """
+    if cache is not None and hash_seed() is None:
+        raise ValueError("Results cannot be cached unless PYTHONHASHSEED is set to an integer")
+    processes = processes or os.cpu_count()
+    version = code_version() if cache is not None else None
+    to_run = []
+    for cell in cells:
+        key = cell_key(cell.env_id, cell.seed, experiments[cell.experiment], version) if cache is not None else None
+        result = cache.get(key) if cache is not None else None
+        if result is None:
+            to_run.append((cell, key))
+        else:
+            # The name of the experiment is not part of the key
+            result['experiment'] = cell.experiment
+            yield result
+    if not to_run:
+        return
+    chunks = iter([to_run[i:i + chunksize] for i in range(0, len(to_run), chunksize)])
+    output_file = open(output, 'a') if output is not None else None
+    try:
+        with ProcessPoolExecutor(processes, initializer=_set_experiments, initargs=(experiments, cache)) as executor:
+            pending = set()
+
+            def _submit_next_chunk():
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.add(executor.submit(_run_chunk, chunk))
+
+            for _ in range(2 * processes):
+                _submit_next_chunk()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _submit_next_chunk()
+                    for result in future.result():
+                        if output_file is not None:
+                            output_file.write(json.dumps(result) + '\n')
+                            output_file.flush()
+                        yield result
+    finally:
+        if output_file is not None:
+            output_file.close()
+
+
+def _map_population(checkpoint: str, cfg: Configuration) -> None:
+    global _mapped_population
+    _mapped_population = MappedPopulation(checkpoint, cfg)
+
+
+def _run_mapped_exploit(task: tuple) -> dict:
+    env_id, seed, trials, slippery_prob, random_attribute_length = task
+    random.seed(seed)
+    np.random.seed(seed)
+    maze = gym.make(env_id)
+    if slippery_prob is not None:
+        maze.env.set_prob_slippery(slippery_prob)
+    if random_attribute_length is not None:
+        maze.env.set_random_attribute_length(random_attribute_length)
+    start = time.perf_counter()
+    metrics = _mapped_population.exploit(maze, trials)
+    return {
+        'maze': env_id,
+        'seed': seed,
+        'exploit_seconds': time.perf_counter() - start,
+        'exploit_average_steps': _average_steps(metrics),
+        'exploit_metrics': metrics
+    }
+
+
+def run_mapped_exploit(
+        checkpoint: str,
+        env_id: str,
+        seeds: Iterable[int],
+        trials: int,
+        cfg: Configuration = None,
+        slippery_prob: float = None,
+        random_attribute_length: int = None,
+        processes: int = None
+    ) -> Iterator[dict]:
+    """
+    Runs exploitation trials of a saved population, without learning, on a
+    maze with several seeds over a pool of processes. Every process maps the
+    checkpoint once, the pages of the population being shared by all of them.
+
+    Parameters
+    ----------
+    checkpoint: str
+        Checkpoint written by BEACS.save_checkpoint
+    env_id: str
+        Maze
+    seeds: Iterable[int]
+        Seeds, one run per seed
+    trials: int
+        Exploitation trials of a run
+    cfg: Configuration
+        Configuration of the exploitation, the one of the checkpoint if None
+    slippery_prob: float
+        Slippery probability of the maze, the default one if None
+    random_attribute_length: int
+        Number of random attributes of the maze, the default one if None
+    processes: int
+        Number of processes, the number of CPUs if None
+
+    Returns
+    -------
+    Iterator[dict]
+        Results of the runs, in the order of the seeds
+    """
+    tasks = [(env_id, seed, trials, slippery_prob, random_attribute_length) for seed in seeds]
+    with ProcessPoolExecutor(processes or os.cpu_count(), initializer=_map_population,
+            initargs=(checkpoint, cfg)) as executor:
+        for result in executor.map(_run_mapped_exploit, tasks):
+            yield result
+
+
+if __name__ == '__main__':
+    maze_ids = sorted(spec.id for spec in gym.envs.registry.all() if str(spec.entry_point).startswith('my_mazes.'))
+    parser = argparse.ArgumentParser(description="Runs BEACS on a grid of mazes and seeds over a pool of processes")
+    parser.add_argument('--settings', default=SETTINGS, help="expe.cfg file")
+    parser.add_argument('--mazes', nargs='+', default=maze_ids, choices=maze_ids, help="mazes, all of them by default")
+    parser.add_argument('--iterations', type=int, help="seeds per maze instead of the ones of the settings")
+    parser.add_argument('--explore-trials', type=int, help="exploration trials instead of the ones of the settings")
+    parser.add_argument('--exploit-trials', type=int, help="trials of both exploitation phases instead of the ones of the settings")
+    parser.add_argument('--processes', type=int, help="processes, the number of CPUs by default")
+    parser.add_argument('--chunksize', type=int, default=1, help="cells sent to a process at once")
+    parser.add_argument('--output', default='results.jsonl', help="JSON lines file the results are appended to")
+    parser.add_argument('--cache', default='runner_cache', help="directory of the cached results, '' for none. Requires PYTHONHASHSEED")
+    args = parser.parse_args()
+
+    settings = load_settings(args.settings)
+    experiment = experiment_from_settings(settings)
+    if args.explore_trials is not None:
+        experiment = experiment._replace(explore_trials=args.explore_trials)
+    if args.exploit_trials is not None:
+        experiment = experiment._replace(exploit_no_rl_trials=args.exploit_trials, exploit_rl_trials=args.exploit_trials)
+    iterations = args.iterations if args.iterations is not None else settings['NUMBER_OF_ITERATIONS_TO_BENCH']
+    cells = grid(args.mazes, range(iterations), ['default'])
+
+    cache = ResultCache(args.cache) if args.cache else None
+    start = time.perf_counter()
+    results = run_grid(cells, {'default': experiment}, args.output, args.processes, args.chunksize, cache)
+    for idx, result in enumerate(results, 1):
+        print("{:>6}/{} {:>16} seed {:>4} knowledge {:>6.2f} population {:>6} -> {:>6} ({:.0f} s)".format(
+            idx, len(cells), result['maze'], result['seed'], result['explore']['knowledge'],
+            result['explore']['population'], result['zip']['population'], time.perf_counter() - start), flush=True)
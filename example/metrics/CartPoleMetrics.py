@@ -4,22 +4,7 @@
     file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
-
-def population_metrics(
-        population,
-        environment
-    ):
-    metrics = {
-        'population': 0,
-        'numerosity': 0,
-        'reliable': 0,
-    }
-    for cl in population:
-        metrics['population'] += 1
-        metrics['numerosity'] += cl.num
-        if cl.is_reliable():
-            metrics['reliable'] += 1
-    return metrics
+from example.metrics.PopulationMetrics import population_metrics, population_statistics
 
 
 def _cartpole_metrics(
@@ -37,8 +22,4 @@ def _mean_reliable_classifier_specificity(
         env
     ) -> int:
     # TODO : Return values for legacy cl, behavioral cl, enhanced cl, behavioral enhanced cl and all ?
-    reliable_classifiers = [cl for cl in pop if cl.is_reliable()]
-    if len(reliable_classifiers) > 0:
-        return float(sum(cl.specificity for cl in reliable_classifiers)) / len(reliable_classifiers)
-    else:
-        return 1.
\ No newline at end of file
+    return population_statistics(pop, 'mean_reliable_classifier_specificity')['mean_reliable_classifier_specificity']
\ No newline at end of file
@@ -4,22 +4,79 @@
     file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
+import numpy as np
 
-def population_metrics(
-        population,
-        environment
-    ):
-    metrics = {
-        'population': 0,
-        'numerosity': 0,
-        'reliable': 0,
-    }
+from example.metrics.PopulationMetrics import (
+    population_metrics, population_statistics, reliable_classifiers
+)
+
+
+def _encoder(population):
+    # Perceptions of the maze have to be coded as the classifiers ones
     for cl in population:
-        metrics['population'] += 1
-        metrics['numerosity'] += cl.num
-        if cl.is_reliable():
-            metrics['reliable'] += 1
-    return metrics
+        return cl.cfg.encode
+    return lambda perception: perception
+
+
+def covered_transitions(
+        classifiers,
+        transitions
+    ) -> int:
+    """
+    Counts the transitions (p0, action, p1) predicted by at least one of the
+    classifiers, as Classifier.does_predict_successfully tells.
+
+    Symbols are coded as integers, 0 being the wildcard. For every action,
+    the matching of the conditions and the anticipations of the effects are
+    then computed for all the classifiers and all the transitions at once.
+
+    Parameters
+    ----------
+    classifiers
+        Classifiers
+    transitions
+        Distinct transitions (p0, action, p1)
+
+    Returns
+    -------
+    int
+        Number of transitions predicted
+    """
+    if len(classifiers) == 0:
+        return 0
+    codes = {classifiers[0].condition.wildcard: 0}
+    coded = {}
+    def _codes(items, length):
+        # Conditions and effects are often shared, each one is coded once
+        if items not in coded:
+            coded[items] = [codes.setdefault(item, len(codes)) for item in items[:length]]
+        return coded[items]
+
+    transitions_by_action = {}
+    for p0, action, p1 in transitions:
+        transitions_by_action.setdefault(action, []).append((p0, p1))
+    classifiers_by_action = {}
+    for cl in classifiers:
+        classifiers_by_action.setdefault(cl.action, []).append(cl)
+
+    nr_correct = 0
+    for action, action_transitions in transitions_by_action.items():
+        action_classifiers = classifiers_by_action.get(action)
+        if not action_classifiers:
+            continue
+        # Attributes beyond the perceptions are never compared
+        length = len(action_transitions[0][0])
+        p0 = np.array([_codes(tuple(p0), length) for p0, _ in action_transitions])[None]
+        p1 = np.array([_codes(tuple(p1), length) for _, p1 in action_transitions])[None]
+        conditions = np.array([_codes(cl.condition.freeze(), length) for cl in action_classifiers])[:, None]
+        effects = np.array([_codes(effect.freeze(), length)
+            for cl in action_classifiers for effect in cl.effect.effect_list])[:, None]
+        first_effects = np.cumsum([0] + [len(cl.effect.effect_list) for cl in action_classifiers[:-1]])
+        matching = ((conditions == 0) | (p0 == 0) | (conditions == p0)).all(axis=2)
+        anticipated = np.where(effects == 0, p0 == p1, (p0 != p1) & (effects == p1)).all(axis=2)
+        predicted = np.logical_or.reduceat(anticipated, first_effects, axis=0)
+        nr_correct += int((matching & predicted).any(axis=0).sum())
+    return nr_correct
 
 
 def _maze_metrics(
@@ -32,21 +89,18 @@ def _maze_metrics(
             environment
         ) -> float:
         transitions = environment.env.get_all_possible_transitions()
+        encode = _encoder(population)
         env_trans = []
         for start, action, end in transitions:
-            p0 = environment.env.maze.perception(*start)
-            p1 = environment.env.maze.perception(*end)
+            p0 = encode(environment.env.maze.perception(*start))
+            p1 = encode(environment.env.maze.perception(*end))
             env_trans.append((p0, action, p1))
         # Take into consideration only reliable classifiers
-        reliable_classifiers = [cl for cl in population if cl.is_reliable() and cl.behavioral_sequence is None]
+        non_behavioral_classifiers = [cl for cl in reliable_classifiers(population) if cl.behavioral_sequence is None]
         # Count how many transitions are anticipated correctly
-        nr_correct = 0
-        # For all possible destinations from each path cell
-        for p0, action, p1 in set(env_trans):
-            if any(True for cl in reliable_classifiers
-                    if cl.does_predict_successfully(p0, action, p1)):
-                nr_correct += 1
-        return nr_correct / len(set(env_trans)) * 100.0
+        env_trans = set(env_trans)
+        nr_correct = covered_transitions(non_behavioral_classifiers, env_trans)
+        return nr_correct / len(env_trans) * 100.0
 
     metrics = {
         'knowledge': _maze_knowledge(pop, env)
@@ -62,8 +116,10 @@ def _how_many_peps_match_non_aliased_states(
     ) -> int:
     counter = 0
     non_aliased_perceptions = env.env.get_all_non_aliased_states()
-    enhanced_classifiers = [cl for cl in pop if cl.is_reliable() and cl.is_enhanced()]
+    enhanced_classifiers = [cl for cl in reliable_classifiers(pop) if cl.is_enhanced()]
+    encode = _encoder(pop)
     for percept in non_aliased_perceptions:
+        percept = encode(percept)
         for cl in enhanced_classifiers:
             if cl.does_match(percept):
                 counter += 1
@@ -74,19 +130,12 @@ def _mean_reliable_classifier_specificity(
         pop,
         env
     ) -> int:
-    mean_reliable_classifier_specificity = 1.
-    mean_reliable_non_behavioral_classifier_specificity = 1.
-    mean_reliable_behavioral_classifier_specificity = 1.
-    reliable_classifiers = [cl for cl in pop if cl.is_reliable()]
-    if len(reliable_classifiers) > 0:
-        mean_reliable_classifier_specificity = float(sum(cl.specificity for cl in reliable_classifiers)) / len(reliable_classifiers)
-        non_behavioral_cl = [cl for cl in reliable_classifiers if not cl.behavioral_sequence]
-        if len(non_behavioral_cl) > 0:
-            mean_reliable_non_behavioral_classifier_specificity = float(sum(cl.specificity for cl in non_behavioral_cl)) / len(non_behavioral_cl)
-        behavioral_cl = [cl for cl in reliable_classifiers if cl.behavioral_sequence]
-        if len(behavioral_cl) > 0:
-            mean_reliable_behavioral_classifier_specificity = float(sum(cl.specificity for cl in behavioral_cl)) / len(behavioral_cl)
-    return mean_reliable_classifier_specificity, mean_reliable_non_behavioral_classifier_specificity, mean_reliable_behavioral_classifier_specificity
+    statistics = population_statistics(pop,
+        'mean_reliable_classifier_specificity',
+        'mean_reliable_non_behavioral_classifier_specificity',
+        'mean_reliable_behavioral_classifier_specificity'
+    )
+    return tuple(statistics.values())
 
 
 def _when_full_knowledge_is_achieved(metrics) -> tuple:
@@ -114,8 +163,10 @@ def _enhanced_effect_error(
     theoritical_probabilities = environment.env.get_theoritical_probabilities()
     # Accumulation of difference in probabilities
     error_pep = 0.
+    encode = _encoder(population)
     # For all possible destinations from each path cell
     for perception, action_and_probabiltiies in theoritical_probabilities.items():
+        perception = encode(perception)
         for action, probabilities_and_states in action_and_probabiltiies.items():
             # Try to find a suitable one, even if it is unreliable
             unreliable_classifiers = [cl for cl in population if cl.does_match(perception) and cl.action ==  action and cl.behavioral_sequence is None]
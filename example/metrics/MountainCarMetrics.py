@@ -4,22 +4,7 @@
     file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
-
-def population_metrics(
-        population,
-        environment
-    ):
-    metrics = {
-        'population': 0,
-        'numerosity': 0,
-        'reliable': 0,
-    }
-    for cl in population:
-        metrics['population'] += 1
-        metrics['numerosity'] += cl.num
-        if cl.is_reliable():
-            metrics['reliable'] += 1
-    return metrics
+from example.metrics.PopulationMetrics import population_metrics
 
 
 def _mountaincar_metrics(
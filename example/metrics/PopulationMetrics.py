@@ -0,0 +1,152 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+from beacs.agents.beacs.ClassifierColumns import gather
+
+
+# Statistics of a population, as they are named in the metrics
+STATISTICS = (
+    'population',
+    'numerosity',
+    'reliable',
+    'reliable_enhanced',
+    'mean_reliable_classifier_specificity',
+    'mean_reliable_non_behavioral_classifier_specificity',
+    'mean_reliable_behavioral_classifier_specificity'
+)
+
+# Statistics needing a walk through the reliable classifiers
+_RELIABLE_STATISTICS = STATISTICS[3:]
+
+
+def reliable_classifiers(population) -> list:
+    """
+    Selects the reliable classifiers of a population, reading their quality
+    in the columns when the classifiers view the same ones.
+
+    Parameters
+    ----------
+    population
+        Classifiers
+
+    Returns
+    -------
+    list
+        Reliable classifiers, in the order of the population
+    """
+    columns = gather(population, 'q')
+    if columns is not None:
+        q, = columns
+        is_reliable = (q > population[0].cfg.theta_r).tolist()
+        return [cl for cl, flag in zip(population, is_reliable) if flag]
+    return [cl for cl in population if cl.is_reliable()]
+
+
+def population_statistics(
+        population,
+        *names: str
+    ) -> dict:
+    """
+    Computes statistics of a population, every one of them in the same walk
+    through the classifiers.
+
+    Counts are read in the columns when the classifiers view the same ones.
+    Mean specificities default to 1. when no classifier is concerned.
+
+    Parameters
+    ----------
+    population
+        Classifiers
+    names: str
+        Names of the statistics to compute, taken from STATISTICS, all of
+        them if none is given
+
+    Returns
+    -------
+    dict
+        Statistics by name
+    """
+    names = names or STATISTICS
+    for name in names:
+        if name not in STATISTICS:
+            raise ValueError("Unknown population statistic: {}".format(name))
+    walk_reliable = any(name in _RELIABLE_STATISTICS for name in names)
+    statistics = {}
+
+    columns = gather(population, 'num', 'q')
+    if columns is not None:
+        num, q = columns
+        is_reliable = q > population[0].cfg.theta_r
+        statistics['population'] = len(num)
+        statistics['numerosity'] = int(num.sum())
+        statistics['reliable'] = int(is_reliable.sum())
+        if walk_reliable:
+            reliable = [cl for cl, flag in zip(population, is_reliable.tolist()) if flag]
+    else:
+        statistics['population'] = 0
+        statistics['numerosity'] = 0
+        reliable = []
+        for cl in population:
+            statistics['population'] += 1
+            statistics['numerosity'] += cl.num
+            if cl.is_reliable():
+                reliable.append(cl)
+        statistics['reliable'] = len(reliable)
+
+    if walk_reliable:
+        enhanced = 0
+        specificity, non_behavioral_specificity, behavioral_specificity = 0., 0., 0.
+        nr_non_behavioral, nr_behavioral = 0, 0
+        for cl in reliable:
+            cl_specificity = cl.specificity
+            specificity += cl_specificity
+            if cl.behavioral_sequence:
+                behavioral_specificity += cl_specificity
+                nr_behavioral += 1
+            else:
+                non_behavioral_specificity += cl_specificity
+                nr_non_behavioral += 1
+            if cl.is_enhanced():
+                enhanced += 1
+        statistics['reliable_enhanced'] = enhanced
+        statistics['mean_reliable_classifier_specificity'] = \
+            specificity / len(reliable) if reliable else 1.
+        statistics['mean_reliable_non_behavioral_classifier_specificity'] = \
+            non_behavioral_specificity / nr_non_behavioral if nr_non_behavioral else 1.
+        statistics['mean_reliable_behavioral_classifier_specificity'] = \
+            behavioral_specificity / nr_behavioral if nr_behavioral else 1.
+
+    return {name: statistics[name] for name in names}
+
+
+def statistics_collector(*names: str):
+    """
+    Builds a metrics collector giving statistics of the population, to be
+    used as `user_metrics_collector_fcn` of the configuration.
+
+    Parameters
+    ----------
+    names: str
+        Names of the statistics to collect, all of them if none is given
+
+    Returns
+    -------
+    Callable
+        Function of the population and the environment giving the statistics
+    """
+    def _collect(
+            population,
+            environment
+        ) -> dict:
+        return population_statistics(population, *names)
+    return _collect
+
+
+def population_metrics(
+        population,
+        environment
+    ) -> dict:
+    return population_statistics(population, 'population', 'numerosity', 'reliable')
@@ -1,4 +1,5 @@
 from ..envs.abstract_maze import AbstractMaze
+from ..envs.batch_maze import BatchMaze
 from ..envs.Cassandra4x4 import Cassandra4x4
 from ..envs.Lab1 import Lab1
 from ..envs.Littman57 import Littman57
@@ -4,21 +4,56 @@
     file, You can obtain one at http://mozilla.org/MPL/2.0/.
 """
 
+import hashlib
 import io
+import os
+import pickle
 import random
 import sys
 import gym
-import networkx as nx
 import numpy as np
 from gym import spaces, utils
 
 from .. import find_action_by_direction
 from .. import ACTION_LOOKUP
 from ..maze import Maze, WALL_MAPPING, PATH_MAPPING, ALIASING_MAPPING, REWARD_MAPPING
-from ..utils import create_graph
+from ..utils import create_adjacency
 
 ANIMAT_MARKER = 5
 
+# Version of the tables persisted by set_tables_directory, to be increased
+# whenever the way they are built changes
+TABLES_VERSION = 1
+
+# Tables computed from the mazes, shared by all instances
+_TABLES = {}
+_TABLES_DIRECTORY = None
+_BUILDERS_VERSION = None
+
+
+def set_tables_directory(directory=None):
+    """
+    Sets the directory where the tables computed from the mazes (transitions,
+    theoritical probabilities) are persisted, so that they are computed once
+    across runs. Nothing is persisted if None. The tables persisted by another
+    version of the code building them are not reused.
+    """
+    global _TABLES_DIRECTORY
+    _TABLES_DIRECTORY = directory
+
+
+def _builders_version():
+    # Hash of the source code building the tables: this module, the maze
+    # and the adjacency of its cells
+    global _BUILDERS_VERSION
+    if _BUILDERS_VERSION is None:
+        digest = hashlib.sha1()
+        for module_name in (__name__, Maze.__module__, create_adjacency.__module__):
+            with open(sys.modules[module_name].__file__, 'rb') as source:
+                digest.update(source.read())
+        _BUILDERS_VERSION = digest.hexdigest()
+    return _BUILDERS_VERSION
+
 
 class MazeObservationSpace(gym.Space):
     def __init__(self, n):
@@ -80,6 +115,29 @@ class AbstractMaze(gym.Env):
         self._insert_animat()
         return self._observe()
 
+    def reset_many(self, n: int):
+        """
+        Draws the starting positions of n episodes, as n successive calls to
+        `reset` would. The animat is left on the last one.
+
+        Parameters
+        ----------
+        n: int
+            Number of episodes
+
+        Returns
+        -------
+        tuple
+            Array of shape (n, 2) holding the (X, Y) starting coordinates
+            and the list of the n first observations
+        """
+        positions = np.empty((n, 2), dtype=np.int64)
+        observations = []
+        for i in range(n):
+            observations.append(self.reset())
+            positions[i] = self.pos_x, self.pos_y
+        return positions, observations
+
     def render(self, mode='aliasing_human'):
         if mode == 'aliasing_human':
             self._render_to_file(sys.stdout, aliasing_mode=True)
@@ -92,19 +150,53 @@ class AbstractMaze(gym.Env):
         else:
             super(AbstractMaze, self).render(mode=mode)
 
+    def _memoized(self, name, build):
+        """
+        Returns the table `name`, built once per maze, slippery probability
+        and random attribute length. The table is shared: it must not be
+        modified.
+        """
+        key = (name, type(self).__name__, self.maze.matrix.shape, self.maze.matrix.tobytes(),
+            self.prob_slippery, self.random_attribute_length)
+        if key in _TABLES:
+            return _TABLES[key]
+        path = None
+        if _TABLES_DIRECTORY is not None:
+            # The tables persisted by an other version of the tables or of
+            # the code building them are left aside
+            digest = hashlib.sha1(repr((TABLES_VERSION, _builders_version()) + key).encode()).hexdigest()
+            path = os.path.join(_TABLES_DIRECTORY, "{}-{}.pickle".format(name, digest))
+        if path is not None and os.path.exists(path):
+            with open(path, 'rb') as f:
+                table = pickle.load(f)
+        else:
+            table = build()
+            if path is not None:
+                os.makedirs(_TABLES_DIRECTORY, exist_ok=True)
+                tmp_path = "{}.{}.tmp".format(path, os.getpid())
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(table, f)
+                os.replace(tmp_path, path)
+        _TABLES[key] = table
+        return table
+
     def get_all_possible_transitions(self):
+        return self._memoized('transitions', self._build_all_possible_transitions)
+
+    def _build_all_possible_transitions(self):
         transitions = []
-        g = create_graph(self)
-        path_nodes = (node for node, data
-            in g.nodes(data=True) if data['type'] == 'path')
-        for node in path_nodes:
-            for neighbour in nx.all_neighbors(g, node):
+        adjacency = create_adjacency(self)
+        for node in self.maze.insertion_coordinates:
+            for neighbour in adjacency[node]:
                 direction = Maze.distinguish_direction(node, neighbour)
                 action = find_action_by_direction(direction)
                 transitions.append((node, action, neighbour))
         return transitions
 
     def get_theoritical_probabilities(self):
+        return self._memoized('theoritical_probabilities', self._build_theoritical_probabilities)
+
+    def _build_theoritical_probabilities(self):
         # get all transitions
         transitions = []
         for node, action, neighbour in self.get_all_possible_transitions():
@@ -179,11 +271,11 @@ class AbstractMaze(gym.Env):
         return all_non_aliased_states
 
     def _observe(self):
-        n, ne, e, se, s, sw, w, nw =  self.maze.perception(self.pos_x, self.pos_y)
+        perception = self.maze.perception(self.pos_x, self.pos_y)
         if self.random_attribute_length == 1:
-            return n, ne, e, se, s, sw, w, nw, str(random.randint(0, 1))
+            return perception + (str(random.randint(0, 1)),)
         else:
-            return n, ne, e, se, s, sw, w, nw
+            return perception
 
     def _get_reward(self):
         if self.maze.is_reward(self.pos_x, self.pos_y):
@@ -196,50 +288,13 @@ class AbstractMaze(gym.Env):
 
     def _take_action(self, action, observation):
         """Executes the action inside the maze"""
-        animat_moved = False
-        action_type = ACTION_LOOKUP[action]
-
-        if action_type == "N" and not self.is_wall(observation[0]):
-            self.pos_y -= 1
-            animat_moved = True
-
-        if action_type == 'NE' and not self.is_wall(observation[1]):
-            self.pos_x += 1
-            self.pos_y -= 1
-            animat_moved = True
-
-        if action_type == "E" and not self.is_wall(observation[2]):
-            self.pos_x += 1
-            animat_moved = True
-
-        if action_type == 'SE' and not self.is_wall(observation[3]):
-            self.pos_x += 1
-            self.pos_y += 1
-            animat_moved = True
-
-        if action_type == "S" and not self.is_wall(observation[4]):
-            self.pos_y += 1
-            animat_moved = True
-
-        if action_type == 'SW' and not self.is_wall(observation[5]):
-            self.pos_x -= 1
-            self.pos_y += 1
-            animat_moved = True
-
-        if action_type == "W" and not self.is_wall(observation[6]):
-            self.pos_x -= 1
-            animat_moved = True
-
-        if action_type == 'NW' and not self.is_wall(observation[7]):
-            self.pos_x -= 1
-            self.pos_y -= 1
-            animat_moved = True
-
+        pos_x, pos_y = self.maze.transitions[self.pos_y, self.pos_x, action].tolist()
+        animat_moved = pos_x != self.pos_x or pos_y != self.pos_y
+        self.pos_x, self.pos_y = pos_x, pos_y
         return animat_moved
 
     def _insert_animat(self):
-        possible_coords = self.maze.get_possible_insertion_coordinates()
-        starting_position = random.choice(possible_coords)
+        starting_position = random.choice(self.maze.insertion_coordinates)
         self.pos_x = starting_position[0]
         self.pos_y = starting_position[1]
 
@@ -0,0 +1,160 @@
+"""
+    This Source Code Form is subject to the terms of the Mozilla Public
+    License, v. 2.0. If a copy of the MPL was not distributed with this
+    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+"""
+
+import numpy as np
+
+from .. import ACTION_LOOKUP
+from ..envs.abstract_maze import AbstractMaze
+
+
+class BatchMaze:
+    """
+    Steps several animats in copies of the same maze with a single call.
+
+    Positions are kept in NumPy arrays and moves, perceptions, rewards and
+    ends of episode are read from the tables of the maze, for all animats at
+    once. An animat reaching the reward is put back on a starting cell, the
+    perception where its episode ended being given in the info dict, as
+    gym's vectorized environments do. An episode also ends once it has lasted
+    the `max_episode_steps` of the maze registration, as with gym.make.
+
+    The slippery moves and the random attribute of the maze are drawn with
+    np.random, all animats at once. The starting cells are drawn with
+    np.random as well, unless the maze overrides `_insert_animat`: its own
+    draw is then used for every animat.
+    """
+
+    def __init__(
+            self,
+            env: AbstractMaze,
+            n: int
+        ) -> None:
+        """
+        Parameters
+        ----------
+        env: AbstractMaze
+            Maze to simulate, with its slippery probability and random
+            attribute length, possibly wrapped by gym.make
+        n: int
+            Number of animats
+        """
+        spec = getattr(env, 'spec', None)
+        self.max_episode_steps = spec.max_episode_steps if spec is not None else None
+        env = env.unwrapped
+        self.env = env
+        self.n = n
+        maze = env.maze
+        self.prob_slippery = env.prob_slippery
+        self.random_attribute_length = env.random_attribute_length
+        self.transitions = maze.transitions
+        self.insertion_coordinates = np.array(maze.insertion_coordinates, dtype=np.int64)
+        self.perceptions = np.empty((maze.max_y, maze.max_x, len(ACTION_LOOKUP)), dtype=object)
+        for y in range(maze.max_y):
+            for x in range(maze.max_x):
+                self.perceptions[y, x] = maze.perception(x, y)
+        self.rewards = np.zeros((maze.max_y, maze.max_x), dtype=np.int64)
+        self.dones = np.zeros((maze.max_y, maze.max_x), dtype=bool)
+        # Rewards and ends of episode of the maze itself, read on every cell
+        pos_x, pos_y = env.pos_x, env.pos_y
+        for y in range(maze.max_y):
+            for x in range(maze.max_x):
+                env.pos_x, env.pos_y = x, y
+                self.rewards[y, x] = env._get_reward()
+                self.dones[y, x] = env._is_over()
+        env.pos_x, env.pos_y = pos_x, pos_y
+        self.pos_x = np.zeros(n, dtype=np.int64)
+        self.pos_y = np.zeros(n, dtype=np.int64)
+        self.elapsed_steps = np.zeros(n, dtype=np.int64)
+        self._own_insertion = type(env)._insert_animat is not AbstractMaze._insert_animat
+
+
+    def _insert_animats(
+            self,
+            indices: np.ndarray
+        ) -> None:
+        self.elapsed_steps[indices] = 0
+        if self._own_insertion:
+            for idx in indices.tolist():
+                self.env._insert_animat()
+                self.pos_x[idx], self.pos_y[idx] = self.env.pos_x, self.env.pos_y
+            return
+        starts = self.insertion_coordinates[np.random.randint(len(self.insertion_coordinates), size=len(indices))]
+        self.pos_x[indices] = starts[:, 0]
+        self.pos_y[indices] = starts[:, 1]
+
+
+    def _observe(
+            self,
+            indices: np.ndarray
+        ) -> np.ndarray:
+        observations = self.perceptions[self.pos_y[indices], self.pos_x[indices]]
+        if self.random_attribute_length == 1:
+            random_attributes = np.random.randint(0, 2, size=len(indices)).astype(str).astype(object)
+            observations = np.concatenate([observations, random_attributes[:, None]], axis=1)
+        return observations
+
+
+    def reset(self) -> np.ndarray:
+        """
+        Puts every animat on a starting cell.
+
+        Returns
+        -------
+        np.ndarray
+            Perceptions of the animats, one row per animat
+        """
+        indices = np.arange(self.n)
+        self._insert_animats(indices)
+        return self._observe(indices)
+
+
+    def step(
+            self,
+            actions
+        ) -> tuple:
+        """
+        Executes one action per animat.
+
+        Parameters
+        ----------
+        actions
+            Array of n actions
+
+        Returns
+        -------
+        tuple
+            Perceptions (one row per animat, the first of a new episode for
+            the animats put back on a starting cell), rewards, ends of episode
+            and an info dict holding under 'final_observations' the last
+            perception of the animats whose episode ended, None for the others,
+            and under 'truncated' whether an episode ended by reaching
+            max_episode_steps, as TimeLimit.truncated does
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        if self.prob_slippery > 0:
+            slipped = np.random.random(self.n) < self.prob_slippery
+            actions = np.where(slipped, np.random.randint(0, len(ACTION_LOOKUP), size=self.n), actions)
+        moves = self.transitions[self.pos_y, self.pos_x, actions]
+        self.pos_x = moves[:, 0].copy()
+        self.pos_y = moves[:, 1].copy()
+        rewards = self.rewards[self.pos_y, self.pos_x]
+        dones = self.dones[self.pos_y, self.pos_x]
+        self.elapsed_steps += 1
+        if self.max_episode_steps is not None:
+            truncated = ~dones & (self.elapsed_steps >= self.max_episode_steps)
+            dones = dones | truncated
+        else:
+            truncated = np.zeros(self.n, dtype=bool)
+        indices = np.arange(self.n)
+        observations = self._observe(indices)
+        final_observations = [None] * self.n
+        finished = np.flatnonzero(dones)
+        if len(finished) > 0:
+            for idx in finished.tolist():
+                final_observations[idx] = tuple(observations[idx])
+            self._insert_animats(finished)
+            observations[finished] = self._observe(finished)
+        return observations, rewards, dones, {'final_observations': final_observations, 'truncated': truncated}
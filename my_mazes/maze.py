@@ -1,5 +1,7 @@
 import random
 
+import numpy as np
+
 PATH_MAPPING = 0
 WALL_MAPPING = 1
 REWARD_MAPPING = 9
@@ -18,8 +20,50 @@ class Maze:
     def __init__(self, matrix, aliasing_matrix):
         self.matrix = matrix
         self.aliasing_matrix = aliasing_matrix
+
+    @property
+    def matrix(self):
+        return self._matrix
+
+    @matrix.setter
+    def matrix(self, matrix):
+        self._matrix = matrix
+        self.refresh()
+
+    def refresh(self):
+        """
+        Computes the perceptions, the moves and the insertion coordinates of
+        every cell. Done when the matrix is set, it has to be called again
+        if the matrix is modified in place.
+        """
         self.max_x = self.matrix.shape[1]
         self.max_y = self.matrix.shape[0]
+        self._perceptions = [[self._perceive(x, y) for x in range(self.max_x)] for y in range(self.max_y)]
+        self._rewards = np.asarray(self.matrix == REWARD_MAPPING).tolist()
+        self.transitions = self._build_transitions()
+        self.insertion_coordinates = tuple(
+            (x, y) for x in range(0, self.max_x) for y in range(0, self.max_y) if self.is_path(x, y)
+        )
+
+    def _build_transitions(self):
+        """
+        Builds the table of the moves: for every cell (X, Y) and every action
+        (N, NE, E, SE, S, SW, W, NW), the coordinates reached by the animat,
+        which stays in place when facing a wall.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape (max_y, max_x, 8, 2) holding (X, Y) coordinates
+        """
+        transitions = np.empty((self.max_y, self.max_x, 8, 2), dtype=np.int64)
+        for y in range(self.max_y):
+            for x in range(self.max_x):
+                perception = self._perceptions[y][x]
+                neighbours = self.get_possible_neighbour_cords(x, y)
+                for action, (attribute, neighbour) in enumerate(zip(perception, neighbours)):
+                    transitions[y, x, action] = (x, y) if attribute == str(WALL_MAPPING) else neighbour
+        return transitions
 
     def get_possible_insertion_coordinates(self):
         """
@@ -30,13 +74,7 @@ class Maze:
         -------
         list of tuples (X,Y) containing coordinates
         """
-        possible_cords = []
-        for x in range(0, self.max_x):
-            for y in range(0, self.max_y):
-                if self.is_path(x, y):
-                    possible_cords.append((x, y))
-
-        return possible_cords
+        return list(self.insertion_coordinates)
 
     def perception(self, pos_x, pos_y):
         if not self._within_x_range(pos_x):
@@ -45,6 +83,9 @@ class Maze:
         if not self._within_y_range(pos_y):
             raise ValueError('Y position not within allowed range')
 
+        return self._perceptions[pos_y][pos_x]
+
+    def _perceive(self, pos_x, pos_y):
         # Position N
         if pos_y == 0:
             n = None
@@ -102,7 +143,7 @@ class Maze:
         return self.matrix[pos_y, pos_x] == PATH_MAPPING
 
     def is_reward(self, pos_x, pos_y):
-        return self.matrix[pos_y, pos_x] == REWARD_MAPPING
+        return self._rewards[pos_y][pos_x]
 
     def is_aliased(self, pos_x, pos_y):
         return self.aliasing_matrix[pos_y, pos_x] == ALIASING_MAPPING
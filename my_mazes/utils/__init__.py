@@ -1 +1 @@
-from .utils import create_graph
+from .utils import create_adjacency, create_graph
@@ -28,3 +28,33 @@ def create_graph(env):
         g.add_edges_from(edges)
 
     return g
+
+
+def create_adjacency(env):
+    """
+    Builds the same graph as `create_graph` as a dict giving, for every node,
+    the list of its neighbours in the order networkx iterates them.
+    """
+    maze = env.maze
+
+    # Nodes, in insertion order
+    nodes = {}
+    for x in range(0, maze.max_x):
+        for y in range(0, maze.max_y):
+            if maze.is_path(x, y):
+                nodes[(x, y)] = 'path'
+            if maze.is_reward(x, y):
+                nodes[(x, y)] = 'reward'
+    adjacency = {node: {} for node in nodes}
+
+    # Undirected edges, a neighbour keeping the position where it was first seen
+    path_nodes = [cords for cords, node_type in nodes.items() if node_type == 'path']
+    for n in path_nodes:
+        neighbour_cells = Maze.get_possible_neighbour_cords(*n)
+        allowed_cells = [c for c in neighbour_cells
+            if maze.is_path(*c) or maze.is_reward(*c)]
+        for dest in allowed_cells:
+            adjacency[n][dest] = None
+            adjacency.setdefault(dest, {})[n] = None
+
+    return {node: list(neighbours) for node, neighbours in adjacency.items()}